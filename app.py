@@ -1,10 +1,21 @@
-from flask import Flask
+from flask import Flask, request, jsonify, flash, redirect, url_for
 from flask_login import LoginManager
+from sqlalchemy.exc import SQLAlchemyError
 from models.models import db, User, Address
 from controllers.authController import authBp
 from controllers.userController import userBp
 from controllers.adminController import adminBp
+from controllers.apiController import apiBp
 from utils.oauth_handler import init_oauth
+from utils.jwt_handler import init_jwt
+from commands import registerCommands
+from utils.spot_allocator import free_spot_pool, SpotAllocationBusy
+from utils.lot_search import lot_search_cache
+from utils.cache import backend_from_url
+from utils.render_pool import render_pool, RenderPoolBusy
+from utils.identity_cache import identity_cache
+from utils.query_counter import init_query_counter
+from utils.password_hashing import password_hasher, PasswordHashingBusy
 from config import DevelopmentConfig, ProductionConfig
 import os
 
@@ -26,6 +37,8 @@ def createApp():
     db.init_app(app)
     
     init_oauth(app)
+    init_jwt(app)
+    init_query_counter(app)
 
     loginManager = LoginManager()
     loginManager.init_app(app)
@@ -33,11 +46,58 @@ def createApp():
 
     @loginManager.user_loader
     def loadUser(userId):
-        return User.query.get(int(userId))
+        return identity_cache.load(int(userId))
+
+    @app.errorhandler(PasswordHashingBusy)
+    def passwordHashingBusy(error):
+        # Shed logins beyond the hashing pool's queue instead of piling up request threads
+        if request.path.startswith('/api/'):
+            return jsonify({'error': 'Too many sign-ins in progress, retry shortly'}), 503, {'Retry-After': '1'}
+        return 'Too many sign-ins in progress, please retry in a moment', 503, {'Retry-After': '1'}
+
+    @app.errorhandler(RenderPoolBusy)
+    def renderPoolBusy(error):
+        # Every render worker is taken; rendering here as well would only add to the overload
+        if request.path.startswith('/api/'):
+            return jsonify({'error': 'Server is busy, retry shortly'}), 503, {'Retry-After': '1'}
+        return 'Server is busy, please retry in a moment', 503, {'Retry-After': '1'}
+
+    @app.errorhandler(SpotAllocationBusy)
+    def spotAllocationBusy(error):
+        # The lot still has free spots; every claim just lost a race, so ask for a retry
+        db.session.rollback()
+        if request.path.startswith('/api/'):
+            return jsonify({'error': 'Parking lot is busy, try again'}), 503, {'Retry-After': '1'}
+        flash('This parking lot is busy right now, please try again', 'error')
+        return redirect(url_for('user.book'))
 
     app.register_blueprint(authBp)
     app.register_blueprint(userBp)
     app.register_blueprint(adminBp)
+    app.register_blueprint(apiBp)
+
+    registerCommands(app)
+
+    lot_search_cache.configure(
+        backend_from_url(app.config['CACHE_URL'], app.config['LOT_SEARCH_CACHE_MAX_ENTRIES']),
+        ttl=app.config['LOT_SEARCH_CACHE_TTL']
+    )
+    render_pool.configure(app.config['RENDER_POOL_WORKERS'], app.config['RENDER_TIMEOUT_SECONDS'])
+    password_hasher.configure(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_SALT_LENGTH'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_MAX_PENDING']
+    )
+    identity_cache.configure(app.config['IDENTITY_CACHE_MAX_ENTRIES'], ttl=app.config['IDENTITY_CACHE_TTL'])
+
+    if app.config['FREE_SPOT_CACHE_ENABLED']:
+        with app.app_context():
+            try:
+                free_spot_pool.warm()
+            except SQLAlchemyError:
+                # Tables not created yet; lots are loaded on first booking
+                db.session.rollback()
 
     return app
 
@@ -45,6 +105,8 @@ app = createApp()
 
 if __name__ == '__main__':
     import os
+    # Spawned render workers would re-import this script and build another app each
+    render_pool.configure(0, app.config['RENDER_TIMEOUT_SECONDS'])
     instance_path = os.path.join(os.path.dirname(__file__), 'instance')
     os.makedirs(instance_path, exist_ok=True)
     
@@ -0,0 +1 @@
+# Benchmarks package for performance and load scripts
@@ -0,0 +1,91 @@
+"""Booking stress test: concurrent bookings/s on one lot; fails if a spot is handed out twice."""
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.database import add_database_arguments, use_database, recreate_tables
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=500, help='Number of booking attempts')
+    parser.add_argument('--spots', type=int, default=300, help='Spots in the contested lot')
+    parser.add_argument('--workers', type=int, default=32, help='Concurrent booking threads')
+    add_database_arguments(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    allowDrop = use_database(args, 'booking_stress')
+
+    from app import createApp
+    from models.models import db, User, Address, ParkingLot, ParkingSpot, ParkingRecord
+    from controllers.userController import createParkingBooking
+    from utils.spot_allocator import SpotAllocationBusy
+
+    app = createApp()
+    with app.app_context():
+        recreate_tables(allowDrop)
+
+        address = Address(address='Stress Test Road', pincode='400001')
+        db.session.add(address)
+        db.session.commit()
+
+        user = User(username='stress@example.com', name='Stress', addressId=address.id)
+        lot = ParkingLot(location='Contested Lot', addressId=address.id, totalSpots=args.spots,
+                         pricePerHour=50, availableSpots=args.spots)
+        db.session.add_all([user, lot])
+        db.session.commit()
+        db.session.add_all([ParkingSpot(lotId=lot.id, spotNumber=n, status='A')
+                            for n in range(1, args.spots + 1)])
+        db.session.commit()
+        lotId, userId = lot.id, user.id
+
+    outcomes = Counter()
+    outcomesLock = threading.Lock()
+
+    def book(index):
+        with app.app_context():
+            selectedLot = db.session.get(ParkingLot, lotId)
+            try:
+                record, error = createParkingBooking(selectedLot, f'MH01AB{index:04d}', userId)
+                outcome = 'booked' if record else 'full'
+            except SpotAllocationBusy:
+                db.session.rollback()
+                outcome = 'busy'
+            except Exception as e:
+                db.session.rollback()
+                outcome = f'error: {type(e).__name__}'
+        with outcomesLock:
+            outcomes[outcome] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(book, range(args.bookings)))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        perSpot = db.session.query(ParkingRecord.spotId, db.func.count(ParkingRecord.id)).filter(
+            ParkingRecord.exitTime.is_(None)
+        ).group_by(ParkingRecord.spotId).all()
+        doubleAllocations = sum(1 for _, count in perSpot if count > 1)
+        occupied = ParkingSpot.query.filter_by(lotId=lotId, status='O').count()
+        lot = db.session.get(ParkingLot, lotId)
+        countersOk = lot.occupiedSpots == occupied and lot.availableSpots == args.spots - occupied
+        backend = db.engine.url.get_backend_name()
+
+    print(f"Database:            {backend}")
+    print(f"Booking attempts:    {args.bookings} ({args.workers} threads, {args.spots} spots)")
+    print(f"Outcomes:            {dict(outcomes)}")
+    print(f"Occupied spots:      {occupied}")
+    print(f"Double allocations:  {doubleAllocations}")
+    print(f"Counters consistent: {countersOk}")
+    print(f"Elapsed:             {elapsed:.2f}s ({args.bookings / elapsed:.0f} bookings/s)")
+
+    if doubleAllocations or not countersOk:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
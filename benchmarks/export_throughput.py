@@ -0,0 +1,53 @@
+"""Export throughput: rows/s and peak memory streaming synthetic history to CSV and Parquet."""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.database import add_database_arguments, use_database
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=1000000, help='Closed parking records to export')
+    parser.add_argument('--lots', type=int, default=500)
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Rows per chunk')
+    add_database_arguments(parser)
+    return parser.parse_args()
+
+def peakMemoryMb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    args = parse_args()
+
+    allowDrop = use_database(args, 'export_throughput')
+
+    from app import createApp
+    from benchmarks.synthetic_data import generate_dataset
+    from utils.export import export_records, EXPORT_FORMATS
+
+    outputDir = tempfile.mkdtemp()
+    app = createApp()
+    with app.app_context():
+        counts = generate_dataset(lots=args.lots, spots=50, users=10000, records=args.records,
+                                  log=lambda message: None, allow_drop=allowDrop)
+        totalRows = counts['parking_record']
+        baselineMemory = peakMemoryMb()
+        print(f"Exporting {totalRows} records (peak RSS before export: {baselineMemory:.0f} MB)")
+
+        for exportFormat in EXPORT_FORMATS:
+            outputPath = os.path.join(outputDir, f'parking_records.{exportFormat}')
+            start = time.perf_counter()
+            with open(outputPath, 'wb') as exportFile:
+                for data in export_records(exportFormat, chunk_size=args.chunk_size):
+                    exportFile.write(data)
+            elapsed = time.perf_counter() - start
+
+            sizeMb = os.path.getsize(outputPath) / 1e6
+            print(f"{exportFormat:<8} {elapsed:6.2f}s  {totalRows / elapsed:9.0f} rows/s  "
+                  f"{sizeMb:7.1f} MB  peak RSS {peakMemoryMb():.0f} MB")
+
+if __name__ == '__main__':
+    main()
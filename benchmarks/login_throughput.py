@@ -0,0 +1,83 @@
+"""Login throughput: logins/s per core per password hash cost, with cheap-request latency."""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.database import add_database_arguments, use_database
+
+METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200, help='Logins per hash method')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent login clients')
+    parser.add_argument('--hash-workers', type=int, default=2, help='Password hashing threads (0 = inline)')
+    parser.add_argument('--methods', nargs='+', default=METHODS, help='werkzeug hash methods to compare')
+    add_database_arguments(parser, drops=False)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    use_database(args, 'login_bench')
+
+    from app import createApp
+    from models.models import db, User
+    from utils.password_hashing import password_hasher
+
+    app = createApp()
+    cores = os.cpu_count() or 1
+    print(f"{args.threads} clients, {args.hash_workers} hashing threads, {cores} core(s)")
+
+    for method in args.methods:
+        # Room for every client to queue, so the run measures throughput rather than shedding
+        password_hasher.configure(method, password_hasher.salt_length, args.hash_workers, max(args.threads * 2, 1))
+
+        with app.app_context():
+            db.create_all()
+            User.query.filter(User.username.like('bench-%')).delete(synchronize_session=False)
+            users = []
+            for i in range(args.threads):
+                benchUser = User(username=f'bench-{i}@example.com', name='Bench')
+                benchUser.setPassword('bench-password')
+                users.append(benchUser)
+            db.session.add_all(users)
+            db.session.commit()
+
+        def login(i):
+            client = app.test_client()
+            response = client.post('/', data={'username': f'bench-{i % args.threads}@example.com', 'password': 'bench-password'})
+            assert response.status_code == 302, response.status_code
+
+        probeLatencies = []
+        done = threading.Event()
+
+        def probe():
+            client = app.test_client()
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get('/.well-known/jwks.json')
+                probeLatencies.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        probeThread = threading.Thread(target=probe)
+        probeThread.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as clients:
+            list(clients.map(login, range(args.logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        probeThread.join()
+
+        loginRate = args.logins / elapsed
+        print(f"{method:22} {loginRate:7.1f} logins/s  {loginRate / cores:7.1f} per core  "
+              f"cheap request p50 {statistics.median(probeLatencies) * 1000:6.1f} ms, "
+              f"max {max(probeLatencies) * 1000:6.1f} ms")
+
+    password_hasher.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Lot search latency: ilike substring scan against the search index, on a synthetic catalogue."""
+import argparse
+import statistics
+import time
+
+from benchmarks.database import add_database_arguments, use_database
+
+QUERIES = [
+    ('exact', 'Mumbai Mall 12'),
+    ('prefix', 'bang'),
+    ('two prefixes', 'chen comp'),
+    ('typo', 'mumbia markt'),
+    ('address', 'sector 4'),
+    ('no match', 'zanzibar'),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lots', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+    add_database_arguments(parser)
+    return parser.parse_args()
+
+def timeQuery(run, repeat):
+    """Return (p50 ms, p95 ms, result count) of repeated runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], len(result)
+
+def main():
+    args = parse_args()
+
+    allowDrop = use_database(args, 'lot_search')
+
+    from app import createApp
+    from models.models import db, ParkingLot
+    from benchmarks.synthetic_data import generate_dataset
+    from utils.search_index import match_lot_ids, search_vocabulary
+
+    app = createApp()
+    with app.app_context():
+        generate_dataset(lots=args.lots, spots=1, users=10, records=0, log=lambda message: None,
+                         allow_drop=allowDrop)
+        vocabulary = search_vocabulary()
+        backend = db.engine.url.get_backend_name()
+
+        print(f"Database: {backend}, {args.lots} lots, {len(vocabulary)} indexed words")
+        print(f"{'query':<28}{'ilike p50':>11}{'search p50':>12}{'p95':>8}{'auto p50':>10}  matches (ilike/search)")
+        for name, text in QUERIES:
+            ilikeP50, _, ilikeCount = timeQuery(
+                lambda: db.session.query(ParkingLot.id).filter(ParkingLot.location.ilike(f'%{text}%')).all(),
+                args.repeat)
+            searchP50, searchP95, searchCount = timeQuery(
+                lambda: match_lot_ids(text, vocabulary=vocabulary), args.repeat)
+            autoP50, _, _ = timeQuery(
+                lambda: match_lot_ids(text, limit=8, vocabulary=vocabulary), args.repeat)
+            print(f"{name + ' (' + text + ')':<28}{ilikeP50:9.2f}ms{searchP50:10.2f}ms{searchP95:6.2f}ms"
+                  f"{autoP50:8.2f}ms  {ilikeCount}/{searchCount}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""QR rendering: payment QR renders/s inline, through the render pool and from the cache."""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--renders', type=int, default=300, help='Renders per measurement')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent request threads')
+    parser.add_argument('--pool-workers', type=int, default=4, help='Render pool processes')
+    return parser.parse_args()
+
+def rate(run, count):
+    start = time.perf_counter()
+    for i in range(count):
+        run(i)
+    return count / (time.perf_counter() - start)
+
+def threadedRate(render, payloads, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as requestThreads:
+        list(requestThreads.map(render, payloads))
+    return len(payloads) / (time.perf_counter() - start)
+
+def main():
+    args = parse_args()
+
+    from utils.qr_codes import upi_payment_payload, render_qr, qr_image, qr_cache
+    from utils.render_pool import render_pool
+
+    payloads = [upi_payment_payload(amount) for amount in range(50, 50 + args.renders)]
+    pngSize = len(render_qr(payloads[0], 'png'))
+    svgSize = len(render_qr(payloads[0], 'svg'))
+
+    pngRate = rate(lambda i: render_qr(payloads[i], 'png'), args.renders)
+    svgRate = rate(lambda i: render_qr(payloads[i], 'svg'), args.renders)
+    qr_image(payloads[0], 'png')
+    hitRate = rate(lambda i: qr_image(payloads[0], 'png'), args.renders * 100)
+
+    print(f"PNG render:    {pngRate:9.0f} renders/s  ({pngSize / 1024:.1f} KB)")
+    print(f"SVG render:    {svgRate:9.0f} renders/s  ({svgSize / 1024:.1f} KB, {svgRate / pngRate:.1f}x PNG)")
+    print(f"Cache hit:     {hitRate:9.0f} lookups/s ({hitRate / pngRate:.0f}x PNG render)")
+    print(f"Cache stats:   {qr_cache.stats()}")
+
+    render_pool.configure(args.pool_workers, timeout=30)
+    render_pool.run(render_qr, payloads[0], 'png')  # Start the worker processes
+    inlineRate = threadedRate(lambda payload: render_qr(payload, 'png'), payloads, args.threads)
+    pooledRate = threadedRate(lambda payload: render_pool.run(render_qr, payload, 'png'), payloads, args.threads)
+    render_pool.shutdown()
+
+    print(f"{args.threads} threads inline: {inlineRate:6.0f} renders/s")
+    print(f"{args.threads} threads pooled: {pooledRate:6.0f} renders/s with {args.pool_workers} processes "
+          f"({pooledRate / inlineRate:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Hot-query plans on the large synthetic dataset; exits non-zero on any full table scan."""
+import argparse
+import sys
+
+from benchmarks.database import add_database_arguments, use_database
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_database_arguments(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    allowDrop = use_database(args, 'query_plans')
+
+    from app import createApp
+    from models.models import db
+    from benchmarks.synthetic_data import generate_dataset
+    from utils.query_plans import check_query_plans
+
+    app = createApp()
+    with app.app_context():
+        generate_dataset(lots=300, spots=50, users=1000, records=30000, log=lambda message: None,
+                         allow_drop=allowDrop)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        failures = check_query_plans()
+
+    if failures:
+        print(f'\n{len(failures)} hot query(ies) regressed')
+        sys.exit(1)
+    print('\nAll hot queries use an index')
+
+if __name__ == '__main__':
+    main()
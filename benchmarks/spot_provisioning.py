@@ -0,0 +1,80 @@
+"""Spot provisioning: ORM against bulk spot creation, and a bulk seed of many lots."""
+import argparse
+import time
+
+from benchmarks.database import add_database_arguments, use_database, recreate_tables
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lots', type=int, default=20, help='1000-spot lots per strategy')
+    parser.add_argument('--spots', type=int, default=1000, help='Spots per provisioned lot')
+    parser.add_argument('--seed-lots', type=int, default=2000, help='Lots in the full bulk seed')
+    parser.add_argument('--seed-spots', type=int, default=100, help='Spots per lot in the full bulk seed')
+    add_database_arguments(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    allowDrop = use_database(args, 'spot_provisioning')
+
+    from app import createApp
+    from models.models import db, Address, ParkingLot, ParkingSpot
+    from utils.spot_provisioning import bulk_insert_spots, provision_spots
+
+    app = createApp()
+    with app.app_context():
+        recreate_tables(allowDrop)
+
+        address = Address(address='Benchmark Road', pincode='400001')
+        db.session.add(address)
+        db.session.commit()
+
+        def newLot(spots):
+            lot = ParkingLot(location='Benchmark Lot', addressId=address.id, totalSpots=spots,
+                             pricePerHour=50, availableSpots=spots)
+            db.session.add(lot)
+            db.session.flush()
+            return lot
+
+        start = time.perf_counter()
+        for _ in range(args.lots):
+            lot = newLot(args.spots)
+            for spotNumber in range(1, args.spots + 1):
+                db.session.add(ParkingSpot(lotId=lot.id, spotNumber=spotNumber, status='A'))
+            db.session.commit()
+        ormElapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.lots):
+            lot = newLot(args.spots)
+            provision_spots(lot.id, args.spots)
+            db.session.commit()
+        bulkElapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        seedAddresses = [Address(address=f'Seed Road {i}', pincode='400001') for i in range(args.seed_lots)]
+        db.session.add_all(seedAddresses)
+        db.session.flush()
+        seedLots = [ParkingLot(location=f'Seed Lot {i}', addressId=seedAddress.id, totalSpots=args.seed_spots,
+                               pricePerHour=50, availableSpots=args.seed_spots)
+                    for i, seedAddress in enumerate(seedAddresses)]
+        db.session.add_all(seedLots)
+        db.session.flush()
+        bulk_insert_spots([{'lotId': lot.id, 'spotNumber': spotNumber, 'status': 'A'}
+                           for lot in seedLots for spotNumber in range(1, args.seed_spots + 1)])
+        db.session.commit()
+        seedElapsed = time.perf_counter() - start
+
+        backend = db.engine.url.get_backend_name()
+
+    seedSpots = args.seed_lots * args.seed_spots
+    print(f"Database:             {backend}")
+    print(f"ORM per-object:       {ormElapsed / args.lots * 1000:.1f} ms per {args.spots}-spot lot")
+    print(f"Bulk provisioning:    {bulkElapsed / args.lots * 1000:.1f} ms per {args.spots}-spot lot "
+          f"({ormElapsed / bulkElapsed:.1f}x faster)")
+    print(f"Full bulk seed:       {args.seed_lots} lots / {seedSpots} spots in {seedElapsed:.2f}s "
+          f"({seedSpots / seedElapsed:.0f} spots/s)")
+
+if __name__ == '__main__':
+    main()
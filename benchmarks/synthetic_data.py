@@ -0,0 +1,268 @@
+"""Synthetic production-scale dataset of lots, spots, users and parking history."""
+import argparse
+import math
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.database import add_database_arguments, use_database
+
+# City centres and pincode prefixes taken from seed_data
+CITIES = [
+    ('Mumbai', 19.0760, 72.8777, '400'),
+    ('Delhi', 28.6139, 77.2090, '110'),
+    ('Bangalore', 12.9716, 77.5946, '560'),
+    ('Chennai', 13.0827, 80.2707, '600'),
+    ('Hyderabad', 17.3850, 78.4867, '500'),
+    ('Pune', 18.5204, 73.8567, '411'),
+    ('Kolkata', 22.5726, 88.3639, '700'),
+    ('Ahmedabad', 23.0225, 72.5714, '380'),
+    ('Una', 31.4685, 76.2708, '177'),
+]
+
+LOT_KINDS = ['Mall', 'Metro', 'Station', 'IT Park', 'Market', 'Plaza', 'Hub', 'Complex']
+
+# Relative share of entries per hour of day: morning and evening peaks
+HOURLY_ENTRY_WEIGHTS = np.array([
+    1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 10, 8,
+    8, 8, 7, 7, 8, 10, 12, 11, 8, 5, 3, 2
+], dtype=np.float64)
+
+CHUNK_SIZE = 50000
+
+def _cities(count, rng):
+    """Known cities first, then synthetic ones scattered across India."""
+    cities = list(CITIES[:count])
+    for index in range(len(cities), count):
+        cities.append((
+            f'City {index + 1}',
+            float(rng.uniform(10.0, 30.0)),
+            float(rng.uniform(72.0, 88.0)),
+            f'{100 + index % 800:03d}'
+        ))
+    return cities
+
+def _insert_chunked(table, rows):
+    from models.models import db
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(db.insert(table), rows[start:start + CHUNK_SIZE])
+
+def generate_dataset(cities=9, lots=500, spots=100, users=5000, records=100000,
+                     days=365, occupancy=0.3, seed=42, now=None, log=print, allow_drop=False):
+    """
+    Recreate all tables and fill them with a synthetic dataset.
+
+    Must run inside an application context. Lots are spread around city
+    centres, every lot has `spots` spots, and `occupancy` of all spots hold
+    an open session. Closed sessions follow an hourly entry profile with
+    morning/evening peaks and log-normal durations (median ~2h). Closed
+    history needs users to book it, so users=0 generates none.
+
+    Args:
+        cities: Number of cities
+        lots: Number of parking lots
+        spots: Spots per lot
+        users: Number of non-admin users
+        records: Number of closed ParkingRecords of history
+        days: Length of the history window ending now
+        occupancy: Fraction of spots currently occupied
+        seed: Random seed; equal arguments give an identical dataset
+        now: End of the history window (default: current UTC time)
+        log: Callable for progress messages
+        allow_drop: Drop tables already in the database instead of refusing
+
+    Returns:
+        Dict of row counts per table
+    """
+    from models.models import db, User, Address, ParkingLot, ParkingSpot, ParkingRecord
+    from utils.spot_provisioning import bulk_insert_spots
+    from benchmarks.database import recreate_tables
+    from werkzeug.security import generate_password_hash
+
+    rng = np.random.default_rng(seed)
+    now = (now or datetime.utcnow()).replace(microsecond=0)
+
+    recreate_tables(allow_drop)
+
+    # Addresses and lots, with explicit ids since the tables are fresh
+    city_rows = _cities(cities, rng)
+    lot_city = rng.integers(0, cities, size=lots)
+    lot_lat = np.array([city_rows[c][1] for c in lot_city]) + rng.normal(0, 0.08, size=lots)
+    lot_lon = np.array([city_rows[c][2] for c in lot_city]) + rng.normal(0, 0.08, size=lots)
+    lot_price = rng.integers(3, 21, size=lots) * 5
+    lot_kind = rng.integers(0, len(LOT_KINDS), size=lots)
+    lot_pin_suffix = rng.integers(0, 1000, size=lots)
+
+    lot_location = [f'{city_rows[c][0]} {LOT_KINDS[k]} {i + 1}' for i, (c, k) in enumerate(zip(lot_city, lot_kind))]
+    lot_address = [f'Sector {i % 97 + 1}, {city_rows[c][0]}' for i, c in enumerate(lot_city)]
+    lot_pincode = [f'{city_rows[c][3]}{s:03d}' for c, s in zip(lot_city, lot_pin_suffix)]
+
+    # Open sessions: pick occupied spots up front so counters are known
+    total_spots = lots * spots
+    occupied_count = int(total_spots * occupancy)
+    occupied_positions = np.sort(rng.choice(total_spots, size=occupied_count, replace=False))
+    occupied_per_lot = np.bincount(occupied_positions // spots, minlength=lots)
+
+    started = time.perf_counter()
+    address_rows = [{'id': 1, 'address': 'Admin Office, Central Avenue', 'pincode': '000000'}]
+    address_rows += [{'id': i + 2, 'address': lot_address[i], 'pincode': lot_pincode[i]} for i in range(lots)]
+    _insert_chunked(Address, address_rows)
+
+    _insert_chunked(ParkingLot, [{
+        'id': i + 1,
+        'location': lot_location[i],
+        'addressId': i + 2,
+        'totalSpots': spots,
+        'pricePerHour': int(lot_price[i]),
+        'latitude': round(float(lot_lat[i]), 6),
+        'longitude': round(float(lot_lon[i]), 6),
+        'availableSpots': spots - int(occupied_per_lot[i]),
+        'occupiedSpots': int(occupied_per_lot[i])
+    } for i in range(lots)])
+    log(f'✓ {lots} lots across {cities} cities ({time.perf_counter() - started:.1f}s)')
+
+    # Spots are bulk inserted in (lot, number) order, so spot id = position + 1
+    started = time.perf_counter()
+    status = np.full(total_spots, 'A')
+    status[occupied_positions] = 'O'
+    for start in range(0, total_spots, CHUNK_SIZE * 4):
+        end = min(start + CHUNK_SIZE * 4, total_spots)
+        bulk_insert_spots([
+            {'lotId': position // spots + 1, 'spotNumber': position % spots + 1, 'status': str(status[position])}
+            for position in range(start, end)
+        ])
+    db.session.flush()
+    max_spot_id = db.session.query(db.func.max(ParkingSpot.id)).scalar() or 0
+    if max_spot_id != total_spots:
+        raise RuntimeError('Spot ids are not contiguous; generate into an empty database')
+    log(f'✓ {total_spots} spots, {occupied_count} occupied ({time.perf_counter() - started:.1f}s)')
+
+    # Users share one password hash: hashing per user would dominate runtime
+    started = time.perf_counter()
+    admin_hash = generate_password_hash('admin123')
+    user_hash = generate_password_hash('user123')
+    user_rows = [{'id': 1, 'username': 'admin', 'passwordHash': admin_hash, 'name': 'Admin',
+                  'addressId': 1, 'isAdmin': True}]
+    user_rows += [{'id': i + 2, 'username': f'user{i + 1}@synthetic.test', 'passwordHash': user_hash,
+                   'name': f'Synthetic User {i + 1}', 'addressId': None, 'isAdmin': False}
+                  for i in range(users)]
+    _insert_chunked(User, user_rows)
+    log(f'✓ {users} users (password: user123) + admin/admin123 ({time.perf_counter() - started:.1f}s)')
+
+    def record_rows(count, lot_ids, user_ids, spot_ids, entry, exit_):
+        rows = []
+        for i in range(count):
+            lot_index = int(lot_ids[i])
+            user_id = int(user_ids[i])
+            price = int(lot_price[lot_index])
+            exit_time = exit_[i] if exit_ is not None else None
+            rows.append({
+                'userId': user_id,
+                'vehicleNumber': f'SY{user_id % 100:02d}AB{user_id:06d}',
+                'entryTime': entry[i],
+                'exitTime': exit_time,
+                'lotId': lot_index + 1,
+                'spotId': int(spot_ids[i]),
+                'bookingPrice': price,
+                'totalAmountPaid': (
+                    math.ceil((exit_time - entry[i]).total_seconds() / 3600) * price if exit_time else 0
+                ),
+                'lotLocation': lot_location[lot_index],
+                'lotAddress': lot_address[lot_index],
+                'lotPincode': lot_pincode[lot_index]
+            })
+        return rows
+
+    # Closed history, generated and written chunk by chunk
+    started = time.perf_counter()
+    records = records if users else 0
+    hour_p = HOURLY_ENTRY_WEIGHTS / HOURLY_ENTRY_WEIGHTS.sum()
+    # Whole days ending at midnight today, so entry hours follow the profile
+    window_start = (now - timedelta(days=days)).replace(hour=0, minute=0, second=0)
+    for start in range(0, records, CHUNK_SIZE):
+        count = min(CHUNK_SIZE, records - start)
+        lot_ids = rng.integers(0, lots, size=count)
+        spot_ids = lot_ids * spots + rng.integers(0, spots, size=count) + 1
+        user_ids = rng.integers(0, users, size=count) + 2
+        entry_seconds = (rng.integers(0, days, size=count) * 86400
+                         + rng.choice(24, size=count, p=hour_p) * 3600
+                         + rng.integers(0, 3600, size=count))
+        duration_seconds = np.clip(rng.lognormal(np.log(2 * 3600), 0.7, size=count), 900, 48 * 3600)
+
+        entry = [window_start + timedelta(seconds=int(s)) for s in entry_seconds]
+        exit_ = [min(e + timedelta(seconds=int(d)), now) for e, d in zip(entry, duration_seconds)]
+        _insert_chunked(ParkingRecord, record_rows(count, lot_ids, user_ids, spot_ids, entry, exit_))
+        db.session.commit()
+        log(f'  … {start + count}/{records} closed records')
+    log(f'✓ {records} closed records over {days} days ({time.perf_counter() - started:.1f}s)')
+
+    # Open sessions for every occupied spot, entered within the last 8 hours
+    started = time.perf_counter()
+    open_entry = [now - timedelta(seconds=int(s)) for s in rng.integers(60, 8 * 3600, size=occupied_count)]
+    _insert_chunked(ParkingRecord, record_rows(
+        occupied_count,
+        occupied_positions // spots,
+        rng.integers(0, users, size=occupied_count) + 2 if users else np.ones(occupied_count, dtype=np.int64),
+        occupied_positions + 1,
+        open_entry,
+        None
+    ))
+
+    # Explicit ids bypass PostgreSQL sequences; move them past the data
+    if db.session.get_bind().dialect.name == 'postgresql':
+        for table in ('address', 'user', 'parking_lot'):
+            db.session.execute(db.text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+            ))
+    db.session.commit()
+    log(f'✓ {occupied_count} open sessions ({time.perf_counter() - started:.1f}s)')
+
+    return {
+        'address': len(address_rows),
+        'user': len(user_rows),
+        'parking_lot': lots,
+        'parking_spot': total_spots,
+        'parking_record': records + occupied_count
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cities', type=int, default=9)
+    parser.add_argument('--lots', type=int, default=500)
+    parser.add_argument('--spots', type=int, default=100, help='Spots per lot')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--records', type=int, default=100000, help='Closed parking records')
+    parser.add_argument('--days', type=int, default=365, help='History window in days')
+    parser.add_argument('--occupancy', type=float, default=0.3, help='Fraction of spots occupied now')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end', type=datetime.fromisoformat,
+                        help='End of the history window, e.g. 2025-01-01 (default: now)')
+    add_database_arguments(parser, required=True)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    allowDrop = use_database(args, 'synthetic')
+
+    from app import createApp
+
+    app = createApp()
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate_dataset(
+            cities=args.cities, lots=args.lots, spots=args.spots, users=args.users,
+            records=args.records, days=args.days, occupancy=args.occupancy, seed=args.seed,
+            now=args.end, allow_drop=allowDrop
+        )
+        elapsed = time.perf_counter() - started
+
+    print('=' * 60)
+    for table, count in counts.items():
+        print(f'{table:16s}{count:>12,}')
+    print(f'Generated in {elapsed:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""JWT verification: verify_token calls/s with full signature checks and with the cache."""
+import argparse
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=1000, help='Distinct access tokens (callers)')
+    parser.add_argument('--verifications', type=int, default=200000, help='verify_token calls per measurement')
+    parser.add_argument('--algorithm', choices=['HS256', 'RS256', 'EdDSA'], default='HS256', help='Signing algorithm')
+    return parser.parse_args()
+
+def rate(run, count):
+    start = time.perf_counter()
+    for i in range(count):
+        run(i)
+    return count / (time.perf_counter() - start)
+
+def main():
+    args = parse_args()
+
+    from flask import Flask
+    from config import DevelopmentConfig
+    from utils.jwt_handler import init_jwt, create_access_token, verify_token, generate_signing_key
+
+    app = Flask(__name__)
+    app.config.from_object(DevelopmentConfig)
+    app.config['JWT_ALGORITHM'] = args.algorithm
+    app.config['JWT_KEY_DIR'] = tempfile.mkdtemp(prefix='jwt_keys_')
+    app.config['JWT_ACTIVE_KEY_ID'] = None
+    if args.algorithm != 'HS256':
+        generate_signing_key(app.config['JWT_KEY_DIR'], args.algorithm)
+
+    with app.app_context():
+        issueRate = rate(lambda i: create_access_token(i, False), args.tokens)
+        tokens = [create_access_token(userId, False) for userId in range(args.tokens)]
+        replay = lambda i: verify_token(tokens[i % len(tokens)])
+
+        app.config['JWT_VERIFY_CACHE_SIZE'] = 0
+        init_jwt(app)
+        uncachedRate = rate(replay, args.verifications)
+
+        app.config['JWT_VERIFY_CACHE_SIZE'] = max(args.tokens, 1)
+        settings = init_jwt(app)
+        cachedRate = rate(replay, args.verifications)
+
+    print(f"Algorithm:      {settings.algorithm}")
+    print(f"Issue:          {issueRate:10.0f} tokens/s")
+    print(f"Verify (full):  {uncachedRate:10.0f} verifications/s")
+    print(f"Verify (cache): {cachedRate:10.0f} verifications/s ({cachedRate / uncachedRate:.1f}x)")
+    print(f"Cache stats:    {settings.stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import sys
+from datetime import timedelta
+import click
+from models.models import db
+from utils.lot_counters import reconcile_lot_counters
+from utils.archive import archive_closed_records
+from utils.rollups import backfill_rollups
+from utils.export import export_records, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+from utils.search_index import ensure_search_index
+from utils.schema_sync import sync_indexes, sync_schema
+from utils.jwt_handler import generate_signing_key, ASYMMETRIC_ALGORITHMS
+
+def registerCommands(app):
+    """Register maintenance commands on the Flask CLI."""
+
+    @app.cli.command('reconcile-spot-counts')
+    def reconcileSpotCounts():
+        """Repair drifted per-lot availability counters."""
+        repairedLots = reconcile_lot_counters()
+        db.session.commit()
+        click.echo(f'Reconciled spot counters for {repairedLots} parking lot(s)')
+
+    @app.cli.command('archive-records')
+    @click.option('--days', type=int, default=None, help='Archive records closed more than this many days ago.')
+    @click.option('--batch-size', type=int, default=5000, show_default=True, help='Records moved per transaction.')
+    def archiveRecords(days, batch_size):
+        """Move old closed parking records into the archive table."""
+        olderThanDays = days if days is not None else app.config['ARCHIVE_AFTER_DAYS']
+        try:
+            archivedCount = archive_closed_records(olderThanDays, batch_size, log=click.echo)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f'{archivedCount} record(s) closed more than {olderThanDays} days ago archived')
+
+    @app.cli.command('backfill-rollups')
+    @click.option('--lots-per-batch', type=int, default=200, show_default=True, help='Lots rebuilt per transaction.')
+    def backfillRollups(lots_per_batch):
+        """Rebuild hourly and daily usage rollups from parking history."""
+        rebuiltLots = backfill_rollups(lots_per_batch, log=click.echo)
+        click.echo(f'Rollups rebuilt for {rebuiltLots} parking lot(s)')
+
+    @app.cli.command('export-records')
+    @click.option('--format', 'exportFormat', type=click.Choice(EXPORT_FORMATS), default='csv', show_default=True)
+    @click.option('--output', default='-', help='Output file (default: stdout).')
+    @click.option('--start', type=click.DateTime(['%Y-%m-%d']), help='First entry date to include.')
+    @click.option('--end', type=click.DateTime(['%Y-%m-%d']), help='Last entry date to include.')
+    @click.option('--lot-id', type=int, help='Only records of this parking lot.')
+    @click.option('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, show_default=True, help='Rows fetched and written per chunk.')
+    def exportRecords(exportFormat, output, start, end, lot_id, chunk_size):
+        """Stream live and archived parking history to CSV or Parquet."""
+        rangeEnd = end + timedelta(days=1) if end else None
+        exportChunks = export_records(exportFormat, start, rangeEnd, lot_id, chunk_size)
+        if output == '-':
+            for data in exportChunks:
+                sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+            return
+        
+        writtenBytes = 0
+        with open(output, 'wb') as exportFile:
+            for data in exportChunks:
+                exportFile.write(data)
+                writtenBytes += len(data)
+        click.echo(f'Exported {writtenBytes / 1e6:.1f} MB to {output}', err=True)
+
+    @app.cli.command('rebuild-search-index')
+    def rebuildSearchIndex():
+        """Create or rebuild the parking lot full-text search index."""
+        if ensure_search_index(db.session.connection(), rebuild=True):
+            db.session.commit()
+            click.echo('Lot search index rebuilt')
+        else:
+            click.echo('No search index for this database; searches use substring scans')
+
+    @app.cli.command('sync-indexes')
+    def syncIndexes():
+        """Create indexes declared on the models and drop ones they replaced."""
+        createdIndexes, droppedIndexes = sync_indexes(db.session.connection(), log=click.echo)
+        db.session.commit()
+        click.echo(f'{createdIndexes} index(es) created, {droppedIndexes} dropped')
+
+    @app.cli.command('sync-schema')
+    def syncSchema():
+        """Create missing tables and columns, backfill counters and sync indexes."""
+        changes = sync_schema(db.session.connection(), log=click.echo)
+        db.session.commit()
+        click.echo(f"{len(changes['tables'])} table(s) and {len(changes['columns'])} column(s) added, "
+                   f"{changes['indexesCreated']} index(es) created, {changes['indexesDropped']} dropped")
+        if 'lot_usage_rollup' in changes['tables']:
+            click.echo('Run `flask backfill-rollups` to build usage rollups from existing history')
+
+    @app.cli.command('generate-jwt-key')
+    @click.option('--algorithm', type=click.Choice(list(ASYMMETRIC_ALGORITHMS)), default='RS256', show_default=True)
+    @click.option('--key-id', default=None, help='Key id (default: current UTC timestamp).')
+    def generateJwtKey(algorithm, key_id):
+        """Add a JWT signing key to JWT_KEY_DIR for rotation."""
+        keyId, keyPath = generate_signing_key(app.config['JWT_KEY_DIR'], algorithm, key_id)
+        click.echo(f'Wrote {algorithm} key {keyId} to {keyPath}; it signs new tokens after the next restart '
+                   f'unless JWT_ACTIVE_KEY_ID pins another key')
@@ -19,9 +19,47 @@ class Config:
     
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
-    JWT_ALGORITHM = 'HS256'
+    # HS256 signs with JWT_SECRET_KEY; RS256/EdDSA sign with the newest (or
+    # JWT_ACTIVE_KEY_ID) private key in JWT_KEY_DIR and publish /.well-known/jwks.json
+    JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+    JWT_KEY_DIR = os.getenv('JWT_KEY_DIR', os.path.join(basedir, 'instance', 'jwt_keys'))
+    JWT_ACTIVE_KEY_ID = os.getenv('JWT_ACTIVE_KEY_ID') or None
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', 60))
     REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv('REFRESH_TOKEN_EXPIRE_DAYS', 7))
+    # Verified tokens remembered per worker until they expire (0 verifies every time)
+    JWT_VERIFY_CACHE_SIZE = int(os.getenv('JWT_VERIFY_CACHE_SIZE', 4096))
+    
+    # werkzeug hash method (e.g. scrypt:16384:8:1, pbkdf2:sha256:600000); older
+    # hashes are upgraded on the user's next login
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    # Threads hashing passwords per worker (0 hashes on the request thread) and
+    # how many hashes may wait before logins get 503
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    
+    # Serve bookings from an in-memory free-spot cache per lot
+    FREE_SPOT_CACHE_ENABLED = os.getenv('FREE_SPOT_CACHE_ENABLED', 'false').lower() == 'true'
+    
+    # Query cache store: memory:// (per process) or redis://host:port/db (shared)
+    CACHE_URL = os.getenv('CACHE_URL', 'memory://')
+    LOT_SEARCH_CACHE_TTL = int(os.getenv('LOT_SEARCH_CACHE_TTL', 300))
+    LOT_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('LOT_SEARCH_CACHE_MAX_ENTRIES', 1024))
+    
+    # Add an X-DB-Queries header to every response (always on in debug mode)
+    QUERY_COUNTER_ENABLED = os.getenv('QUERY_COUNTER_ENABLED', 'false').lower() == 'true'
+    
+    # Logged-in users kept per worker between requests (TTL 0 disables)
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 60))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv('IDENTITY_CACHE_MAX_ENTRIES', 4096))
+    
+    # Worker processes for CPU-bound rendering (0 renders inline) and how
+    # long a request waits for them before it is answered with a 503
+    RENDER_POOL_WORKERS = int(os.getenv('RENDER_POOL_WORKERS', 0))
+    RENDER_TIMEOUT_SECONDS = float(os.getenv('RENDER_TIMEOUT_SECONDS', 2.0))
+    
+    # Closed parking records older than this are moved to the archive table
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
     
     # Google OAuth Configuration
     GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
@@ -1,7 +1,21 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 from models.models import db, User, ParkingLot, ParkingRecord, ParkingSpot, Address
 from controllers.authController import adminRequired
+from utils.spatial_index import spatial_index
+from utils.lot_counters import reconcile_lot_counters
+from utils.spot_allocator import free_spot_pool
+from utils.spot_bitmap import encode_spot_bitmap
+from utils.spot_provisioning import provision_spots
+from utils.rollups import bucket_start, rollup_series, rollup_totals, HOURLY, DAILY
+from utils.export import export_records, EXPORT_FORMATS
+from utils.lot_search import search_lots, lot_search_cache
+from utils.qr_codes import qr_cache
+from utils.render_pool import render_pool
+from utils.identity_cache import identity_cache
+from utils.jwt_handler import get_token_settings
+from utils.password_hashing import password_hasher
+from datetime import datetime, timedelta
 import re
 
 adminBp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -12,10 +26,30 @@ adminBp = Blueprint('admin', __name__, url_prefix='/admin')
 def beforeRequest():
     pass
 
+# Lots shown per dashboard page
+DASHBOARD_PAGE_SIZE = 12
+
+# Longest range the analytics API serves at hourly granularity
+MAX_HOURLY_RANGE_DAYS = 31
+
 @adminBp.route('/')
 def dashboard():
-    allParkingLots = ParkingLot.query.all()
-    return render_template('adminDashboard.html', parkingLots=allParkingLots)
+    # Keyset pagination: each page starts after the last lot id of the previous one
+    afterLotId = request.args.get('after', default=0, type=int)
+    pageLots = ParkingLot.query.filter(ParkingLot.id > afterLotId).order_by(ParkingLot.id).limit(DASHBOARD_PAGE_SIZE + 1).all()
+
+    nextLotId = None
+    if len(pageLots) > DASHBOARD_PAGE_SIZE:
+        pageLots = pageLots[:DASHBOARD_PAGE_SIZE]
+        nextLotId = pageLots[-1].id
+
+    return render_template('adminDashboard.html', parkingLots=pageLots, nextLotId=nextLotId, isFirstPage=afterLotId == 0)
+
+@adminBp.route('/api/lot/<int:lotId>/spots')
+def lotSpots(lotId):
+    """Spot grid for one lot as packed bitmaps, fetched on demand by admin pages."""
+    lotSpotRows = db.session.query(ParkingSpot.spotNumber, ParkingSpot.status).filter_by(lotId=lotId).all()
+    return jsonify({'lotId': lotId, **encode_spot_bitmap(lotSpotRows)})
 
 @adminBp.route('/add-parking-lot', methods=['GET', 'POST'])
 def addParkingLot():
@@ -57,19 +91,16 @@ def addParkingLot():
             location=newLocation,
             addressId=lotAddress.id,
             totalSpots=spots_int,
-            pricePerHour=price_float
+            pricePerHour=price_float,
+            availableSpots=spots_int
         )
         db.session.add(newParkingLot)
-        db.session.commit()
+        db.session.flush()
 
-        for spotIndex in range(1, spots_int + 1):
-            newSpot = ParkingSpot(
-                lotId=newParkingLot.id,
-                spotNumber=spotIndex,
-                status='A'
-            )
-            db.session.add(newSpot)
+        provision_spots(newParkingLot.id, spots_int)
         db.session.commit()
+        spatial_index.invalidate()
+        lot_search_cache.invalidate()
         flash('Parking lot added successfully!', 'success')
         return redirect(url_for('admin.dashboard'))
     return render_template('addParkingLot.html')
@@ -123,21 +154,18 @@ def editParkingLot(lotId):
             
             maxSpotNumber = db.session.query(db.func.max(ParkingSpot.spotNumber)).filter_by(lotId=lotId).scalar() or 0
             spotsToAdd = updatedTotalSpots - actualSpotCount
-            
-            for i in range(spotsToAdd):
-                newSpot = ParkingSpot(
-                    lotId=lotId,
-                    spotNumber=maxSpotNumber + 1 + i,
-                    status='A'
-                )
-                db.session.add(newSpot)
+            provision_spots(lotId, spotsToAdd, first_spot_number=maxSpotNumber + 1)
         elif updatedTotalSpots < actualSpotCount:
             spotsToDeleteCount = actualSpotCount - updatedTotalSpots
             availableSpotsToDelete = ParkingSpot.query.filter_by(lotId=lotId, status='A').order_by(ParkingSpot.spotNumber.desc()).limit(spotsToDeleteCount).all()
             for spotToDelete in availableSpotsToDelete:
                 db.session.delete(spotToDelete)
         selectedParkingLot.totalSpots = updatedTotalSpots
+        reconcile_lot_counters([lotId])
         db.session.commit()
+        spatial_index.invalidate()
+        lot_search_cache.invalidate()
+        free_spot_pool.invalidate(lotId)
         flash('Parking lot updated successfully!', 'success')
         return redirect(url_for('admin.dashboard'))
     return render_template('editParkingLot.html', lot=selectedParkingLot)
@@ -158,6 +186,9 @@ def deleteParkingLot(lotId):
     ParkingSpot.query.filter_by(lotId=lotId).delete()
     db.session.delete(selectedParkingLot)
     db.session.commit()
+    spatial_index.invalidate()
+    lot_search_cache.invalidate()
+    free_spot_pool.invalidate(lotId)
     flash('Parking lot deleted successfully!', 'success')
     return redirect(url_for('admin.dashboard'))
 
@@ -178,13 +209,7 @@ def search():
             flash('Pincode must be 6 digits', 'error')
             return render_template('search.html', results=searchResults)
         
-        searchQuery = ParkingLot.query
-        if searchLocation:
-            searchQuery = searchQuery.filter(ParkingLot.location.ilike(f'%{searchLocation}%'))
-        if searchPincode:
-            searchQuery = searchQuery.join(Address).filter(Address.pincode == searchPincode)
-
-        searchResults = searchQuery.all()
+        searchResults = search_lots(searchLocation, searchPincode)
     return render_template('search.html', results=searchResults)
 
 @adminBp.route('/delete-spot/<int:spotId>', methods=['POST'])
@@ -201,11 +226,24 @@ def deleteSpot(spotId):
     if associatedParkingLot:
         actualSpotCount = ParkingSpot.query.filter_by(lotId=associatedParkingLot.id).count()
         associatedParkingLot.totalSpots = actualSpotCount
+        reconcile_lot_counters([associatedParkingLot.id])
     
     db.session.commit()
+    free_spot_pool.invalidate(selectedSpot.lotId)
+    lot_search_cache.invalidate()
     flash('Spot deleted successfully!', 'success')
     return redirect(url_for('admin.dashboard'))
 
+@adminBp.route('/lot/<int:lotId>/spot/<int:spotNumber>/delete', methods=['POST'])
+def deleteLotSpot(lotId, spotNumber):
+    selectedSpot = ParkingSpot.query.filter_by(lotId=lotId, spotNumber=spotNumber).first_or_404()
+    return deleteSpot(selectedSpot.id)
+
+@adminBp.route('/lot/<int:lotId>/spot/<int:spotNumber>')
+def lotSpotDetails(lotId, spotNumber):
+    selectedSpot = ParkingSpot.query.filter_by(lotId=lotId, spotNumber=spotNumber).first_or_404()
+    return spotDetails(selectedSpot.id)
+
 @adminBp.route('/spot-details/<int:spotId>')
 def spotDetails(spotId):
     selectedSpot = ParkingSpot.query.get_or_404(spotId)
@@ -218,20 +256,109 @@ def spotDetails(spotId):
 def summary():
     totalParkingLots = ParkingLot.query.count()
     totalParkingSpots = db.session.query(db.func.sum(ParkingLot.totalSpots)).scalar() or 0
-    totalOccupiedSpots = ParkingSpot.query.filter_by(status='O').count()
+    totalOccupiedSpots = db.session.query(db.func.sum(ParkingLot.occupiedSpots)).scalar() or 0
     totalAvailableSpots = totalParkingSpots - totalOccupiedSpots
     totalRegisteredUsers = User.query.filter_by(isAdmin=False).count()
     
+    # Usage comes from the daily rollups, never from parking_record
+    tomorrow = bucket_start(datetime.utcnow(), DAILY) + timedelta(days=1)
+    usageToday = rollup_totals(tomorrow - timedelta(days=1), tomorrow)
+    usageWeek = rollup_totals(tomorrow - timedelta(days=7), tomorrow)
+    usageMonth = rollup_totals(tomorrow - timedelta(days=30), tomorrow)
+    monthCapacityHours = totalParkingSpots * 30 * 24
+    
     adminSummaryData = {
         'totalLots': totalParkingLots,
         'totalSpots': totalParkingSpots,
         'occupiedSpots': totalOccupiedSpots,
         'availableSpots': totalAvailableSpots,
-        'totalUsers': totalRegisteredUsers
+        'totalUsers': totalRegisteredUsers,
+        'revenueToday': usageToday['revenue'],
+        'revenueWeek': usageWeek['revenue'],
+        'revenueMonth': usageMonth['revenue'],
+        'sessionsMonth': usageMonth['sessions'],
+        'utilisationMonth': round(usageMonth['occupiedHours'] / monthCapacityHours * 100, 1) if monthCapacityHours else 0
     }
     
     return render_template('summary.html', summary=adminSummaryData)
 
+@adminBp.route('/api/analytics')
+def analytics():
+    """Usage totals and per-bucket series for a date range, read from the rollups."""
+    try:
+        lastDay = datetime.strptime(request.args['end'], '%Y-%m-%d') if 'end' in request.args else bucket_start(datetime.utcnow(), DAILY)
+        firstDay = datetime.strptime(request.args['start'], '%Y-%m-%d') if 'start' in request.args else lastDay - timedelta(days=29)
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates in YYYY-MM-DD format'}), 400
+    
+    rangeEnd = lastDay + timedelta(days=1)
+    if firstDay >= rangeEnd:
+        return jsonify({'error': 'start must not be after end'}), 400
+    
+    period = request.args.get('period', 'day')
+    if period not in ('day', 'hour'):
+        return jsonify({'error': 'period must be day or hour'}), 400
+    if period == 'hour' and rangeEnd - firstDay > timedelta(days=MAX_HOURLY_RANGE_DAYS):
+        return jsonify({'error': f'Hourly data is limited to {MAX_HOURLY_RANGE_DAYS} days'}), 400
+    
+    lotId = request.args.get('lotId', type=int)
+    if lotId is not None:
+        selectedLot = ParkingLot.query.get(lotId)
+        capacitySpots = selectedLot.totalSpots if selectedLot else 0
+    else:
+        capacitySpots = db.session.query(db.func.sum(ParkingLot.totalSpots)).scalar() or 0
+    
+    usageTotals = rollup_totals(firstDay, rangeEnd, lotId)
+    capacityHours = capacitySpots * (rangeEnd - firstDay).total_seconds() / 3600
+    usageTotals['utilisation'] = round(usageTotals['occupiedHours'] / capacityHours * 100, 2) if capacityHours else 0
+    
+    usageSeries = rollup_series(firstDay, rangeEnd, HOURLY if period == 'hour' else DAILY, lotId)
+    for bucket in usageSeries:
+        bucket['bucketStart'] = bucket['bucketStart'].isoformat()
+    
+    return jsonify({
+        'start': firstDay.date().isoformat(),
+        'end': lastDay.date().isoformat(),
+        'lotId': lotId,
+        'period': period,
+        'totals': usageTotals,
+        'series': usageSeries
+    }), 200
+
+@adminBp.route('/api/cache-stats')
+def cacheStats():
+    """Hit/miss counters of this worker's caches and its render pool usage."""
+    return jsonify({
+        'lotSearch': lot_search_cache.stats(),
+        'qrCodes': qr_cache.stats(),
+        'renderPool': render_pool.stats(),
+        'identity': identity_cache.stats(),
+        'verifiedTokens': get_token_settings().stats(),
+        'passwordHashing': password_hasher.stats()
+    }), 200
+
+@adminBp.route('/export/records')
+def exportRecords():
+    """Download live and archived parking history, streamed chunk by chunk."""
+    exportFormat = request.args.get('format', 'csv')
+    if exportFormat not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    try:
+        firstDay = datetime.strptime(request.args['start'], '%Y-%m-%d') if request.args.get('start') else None
+        lastDay = datetime.strptime(request.args['end'], '%Y-%m-%d') if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates in YYYY-MM-DD format'}), 400
+    
+    rangeEnd = lastDay + timedelta(days=1) if lastDay else None
+    lotId = request.args.get('lotId', type=int)
+    
+    exportChunks = export_records(exportFormat, firstDay, rangeEnd, lotId)
+    mimetype = 'application/vnd.apache.parquet' if exportFormat == 'parquet' else 'text/csv'
+    return Response(stream_with_context(exportChunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=parking_records.{exportFormat}'
+    })
+
 @adminBp.route('/edit-profile', methods=['GET', 'POST'])
 def editProfile():
     currentAdminUser = User.query.get(current_user.id)
@@ -258,6 +385,7 @@ def editProfile():
             currentAdminUser.setPassword(newAdminPassword)
             
         db.session.commit()
+        identity_cache.invalidate(currentAdminUser.id)
         flash('Profile updated successfully!', 'success')
         return redirect(url_for('admin.dashboard'))
         
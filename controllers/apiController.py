@@ -0,0 +1,139 @@
+from flask import Blueprint, request, jsonify, abort, make_response
+from models.models import db, User, ParkingLot, ParkingRecord
+from controllers.userController import createParkingBooking, closeParkingBooking, nearbyLotsWithAvailability
+from utils.jwt_handler import create_access_token, create_refresh_token, verify_token, jwt_required
+from utils.history import fetch_history_page
+
+# JSON API for mobile clients. Callers are identified only by the user_id and
+# is_admin claims of their bearer token: no session cookie and no user lookup.
+apiBp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+def jsonObjectBody():
+    """The request's JSON object ({} without a JSON body); any other JSON value aborts with 400."""
+    body = request.get_json(silent=True)
+    if body is None:
+        return {}
+    if not isinstance(body, dict):
+        abort(make_response(jsonify({'error': 'Expected a JSON object'}), 400))
+    return body
+
+def serializeParkingRecord(parkingRecord):
+    return {
+        'id': parkingRecord.id,
+        'lotId': parkingRecord.lotId,
+        'spotId': parkingRecord.spotId,
+        'vehicleNumber': parkingRecord.vehicleNumber,
+        'lotLocation': parkingRecord.lotLocation,
+        'lotAddress': parkingRecord.lotAddress,
+        'lotPincode': parkingRecord.lotPincode,
+        'entryTime': parkingRecord.entryTime.isoformat(),
+        'exitTime': parkingRecord.exitTime.isoformat() if parkingRecord.exitTime else None,
+        'bookingPrice': parkingRecord.bookingPrice,
+        'totalAmountPaid': parkingRecord.totalAmountPaid
+    }
+
+@apiBp.route('/auth/token', methods=['POST'])
+def issueToken():
+    """Exchange a username and password for an access and a refresh token."""
+    credentials = jsonObjectBody()
+    authenticatedUser = User.query.filter_by(username=credentials.get('username')).first()
+
+    if not authenticatedUser or not authenticatedUser.checkPassword(credentials.get('password')):
+        return jsonify({'error': 'Invalid username or password'}), 401
+
+    return jsonify({
+        'access_token': create_access_token(user_id=authenticatedUser.id, is_admin=authenticatedUser.isAdmin),
+        'refresh_token': create_refresh_token(authenticatedUser.id)
+    }), 200
+
+@apiBp.route('/auth/refresh', methods=['POST'])
+def refreshToken():
+    """Issue a new access token for a refresh token sent in the request body."""
+    payload = verify_token(jsonObjectBody().get('refresh_token'), 'refresh')
+    if not payload:
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    # The admin flag is re-read here so claim changes reach clients within one access token lifetime
+    refreshedUser = db.session.get(User, payload['user_id'])
+    if not refreshedUser:
+        return jsonify({'error': 'User not found'}), 404
+
+    return jsonify({
+        'access_token': create_access_token(user_id=refreshedUser.id, is_admin=refreshedUser.isAdmin)
+    }), 200
+
+@apiBp.route('/bookings', methods=['POST'])
+@jwt_required
+def createBooking():
+    bookingRequest = jsonObjectBody()
+    try:
+        selectedLot = db.session.get(ParkingLot, int(bookingRequest.get('lotId')))
+    except (TypeError, ValueError):
+        selectedLot = None
+
+    if not selectedLot:
+        return jsonify({'error': 'Invalid parking lot selected'}), 400
+
+    newParkingRecord, errorMessage = createParkingBooking(
+        selectedLot, str(bookingRequest.get('vehicleNumber', '')), request.user_id
+    )
+
+    if errorMessage:
+        return jsonify({'error': errorMessage}), 400
+
+    return jsonify(serializeParkingRecord(newParkingRecord)), 201
+
+@apiBp.route('/bookings/<int:recordId>/exit', methods=['POST'])
+@jwt_required
+def exitBooking(recordId):
+    """Close a booking: the caller's own, or anyone's for admins."""
+    parkingRecord = db.session.get(ParkingRecord, recordId)
+    if not parkingRecord or (parkingRecord.userId != request.user_id and not request.is_admin):
+        return jsonify({'error': 'Booking not found'}), 404
+
+    if closeParkingBooking(parkingRecord) is None:
+        return jsonify({'error': 'Booking already closed'}), 409
+
+    return jsonify(serializeParkingRecord(parkingRecord)), 200
+
+@apiBp.route('/history')
+@jwt_required
+def history():
+    """The caller's parking history, newest first, one keyset page at a time."""
+    try:
+        historyRecords, nextCursor = fetch_history_page(request.user_id, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'records': [serializeParkingRecord(parkingRecord) for parkingRecord in historyRecords],
+        'nextCursor': nextCursor
+    }), 200
+
+@apiBp.route('/lots/<int:lotId>/availability')
+@jwt_required
+def lotAvailability(lotId):
+    selectedLot = db.session.get(ParkingLot, lotId)
+    if not selectedLot:
+        return jsonify({'error': 'Parking lot not found'}), 404
+
+    return jsonify({
+        'lotId': selectedLot.id,
+        'totalSpots': selectedLot.totalSpots,
+        'availableSpots': selectedLot.availableSpots,
+        'occupiedSpots': selectedLot.occupiedSpots,
+        'price': selectedLot.pricePerHour
+    }), 200
+
+@apiBp.route('/lots/nearby')
+@jwt_required
+def nearbyLots():
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lon', type=float)
+    radius = request.args.get('radius', default=10, type=float)
+    limit = request.args.get('limit', type=int)
+
+    if latitude is None or longitude is None:
+        return jsonify({'error': 'Latitude and longitude are required'}), 400
+
+    return jsonify(nearbyLotsWithAvailability(latitude, longitude, radius, limit)), 200
@@ -1,9 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response
 from flask_login import login_user, logout_user, login_required, current_user
 from models.models import db, User, Address
-from werkzeug.security import check_password_hash
-from utils.jwt_handler import create_access_token, create_refresh_token, verify_token
+from utils.jwt_handler import create_access_token, create_refresh_token, verify_token, get_token_settings
 from utils.oauth_handler import oauth, get_authorization_url, handle_callback
+from utils.identity_cache import identity_cache
 import re
 from functools import wraps
 from datetime import timedelta
@@ -72,16 +72,13 @@ def register():
             flash('Username already exists', 'error')
             return render_template('register.html', **request.form)
             
-        userAddress = Address(address=newUserAddress, pincode=newUserPincode)
-        db.session.add(userAddress)
-        db.session.commit()
-        
         newUser = User(
             username=newUsername,
             name=newUserName,
-            addressId=userAddress.id,
+            address=Address(address=newUserAddress, pincode=newUserPincode),
             isAdmin=False
         )
+        # Hash before anything is written, so a busy hashing pool leaves no orphan address behind
         newUser.setPassword(newPassword)
         db.session.add(newUser)
         db.session.commit()
@@ -128,6 +125,7 @@ def google_callback():
             db.session.add(user)
         
         db.session.commit()
+        identity_cache.invalidate(user.id)
     
     login_user(user)
     
@@ -178,6 +176,13 @@ def refresh():
     
     return jsonify({'access_token': new_access_token}), 200
 
+@authBp.route('/.well-known/jwks.json')
+def jwks():
+    """Public keys for verifying our tokens outside the app (empty with HS256)"""
+    response = jsonify(get_token_settings().jwks)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
 @authBp.route('/logout', methods=['GET', 'POST'])
 @login_required
 def logout():
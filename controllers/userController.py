@@ -1,12 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response
 from flask_login import login_required, current_user
-from models.models import db, User, ParkingLot, ParkingRecord, ParkingSpot, Address
-from utils.geolocation import calculate_distance, find_nearby_lots, sort_by_proximity
+from models.models import db, User, ParkingLot, ParkingRecord, Address
+from utils.geolocation import find_nearby_lots, sort_by_proximity
+from utils.lot_counters import adjust_lot_counters
+from utils.spot_allocator import allocate_spot, free_spot_pool
+from utils.history import fetch_history_page
+from utils.rollups import record_booking, record_exit
+from utils.lot_search import search_lots, autocomplete_lots
+from utils.qr_codes import upi_payment_payload, qr_etag, qr_image, QR_FORMATS, UPI_PAYEE
+from utils.identity_cache import identity_cache
 from datetime import datetime 
 import math
-import qrcode
-import io
-import base64 
 import re
 
 userBp = Blueprint('user', __name__, url_prefix='/user')
@@ -21,22 +25,25 @@ def createParkingBooking(selectedLot, userVehicleNumber, currentUserId):
     if not re.match(r'^[A-Za-z0-9]{4,15}$', userVehicleNumber):
         return None, 'Vehicle number must be 4-15 alphanumeric characters'
 
-    availableSpot = ParkingSpot.query.filter_by(lotId=selectedLot.id, status='A').order_by(ParkingSpot.spotNumber).first()
+    availableSpotId = allocate_spot(selectedLot.id)
 
-    if not availableSpot:
+    if not availableSpotId:
+        db.session.rollback()
         return None, 'No available spots in this parking lot'
 
-    availableSpot.status = 'O'
+    currentEntryTime = datetime.utcnow()
+    adjust_lot_counters(selectedLot.id, available_delta=-1, occupied_delta=1)
+    record_booking(selectedLot.id, currentEntryTime)
     newParkingRecord = ParkingRecord(
         userId=currentUserId,
         vehicleNumber=userVehicleNumber,
         lotId=selectedLot.id,
-        entryTime=datetime.utcnow(), 
+        entryTime=currentEntryTime, 
         bookingPrice=selectedLot.pricePerHour,
         lotLocation=selectedLot.location,
         lotAddress=selectedLot.address.address,
         lotPincode=selectedLot.address.pincode,
-        spotId=availableSpot.id
+        spotId=availableSpotId
     )
 
     db.session.add(newParkingRecord)
@@ -44,6 +51,41 @@ def createParkingBooking(selectedLot, userVehicleNumber, currentUserId):
     
     return newParkingRecord, None
 
+def closeParkingBooking(parkingRecord):
+    """
+    Record the exit and charge of an open booking and free its spot.
+    
+    Returns:
+        Amount charged, or None if the booking was already closed
+    """
+    # Closing twice would re-charge the user and free a spot someone else may hold by now
+    if parkingRecord.exitTime is not None:
+        return None
+    
+    currentExitTime = datetime.utcnow()
+    totalHours = math.ceil((currentExitTime - parkingRecord.entryTime).total_seconds() / 3600)
+    calculatedAmount = totalHours * parkingRecord.bookingPrice
+    
+    # Compare-and-set so that of two concurrent exits only one closes the booking
+    closeResult = db.session.execute(
+        db.update(ParkingRecord)
+        .where(ParkingRecord.id == parkingRecord.id, ParkingRecord.exitTime.is_(None))
+        .values(exitTime=currentExitTime, totalAmountPaid=calculatedAmount)
+    )
+    if closeResult.rowcount != 1:
+        db.session.rollback()
+        return None
+    
+    record_exit(parkingRecord)
+    adjust_lot_counters(parkingRecord.parkingSpot.lotId, available_delta=1, occupied_delta=-1)
+    parkingRecord.parkingSpot.status = 'A'
+    
+    freedSpot = parkingRecord.parkingSpot
+    db.session.commit()
+    free_spot_pool.release(freedSpot.lotId, freedSpot.spotNumber, freedSpot.id)
+    
+    return calculatedAmount
+
 @userBp.route('/')
 def dashboard():
     activeBookings = ParkingRecord.query.filter_by(userId=current_user.id, exitTime=None).all()
@@ -79,16 +121,15 @@ def book():
         flash('Pincode must be 6 digits', 'error')
         searchPincode = ''
     
-    lotQuery = ParkingLot.query 
-    if searchLocation:
-        lotQuery = lotQuery.filter(ParkingLot.location.ilike(f'%{searchLocation}%'))
-    if searchPincode:
-        lotQuery = lotQuery.join(Address).filter(Address.pincode.ilike(f'%{searchPincode}%'))
-    
-    availableLots = lotQuery.all()
+    availableLots = search_lots(searchLocation, searchPincode)
 
     return render_template('book.html', parkingLots=availableLots, searchLocation=searchLocation, searchPin=searchPincode)
 
+@userBp.route('/api/lots/autocomplete')
+def lotAutocomplete():
+    """Ranked lot suggestions for a partially typed location or address."""
+    return jsonify({'suggestions': autocomplete_lots(request.args.get('q', ''))}), 200
+
 @userBp.route('/book-lot/<int:lotId>', methods=['GET', 'POST'])
 def bookLot(lotId):
     selectedLot = ParkingLot.query.get_or_404(lotId)
@@ -120,16 +161,12 @@ def exit(recordId):
     if not parkingRecord:
         return "Record not found", 404
 
+    if parkingRecord.exitTime is not None:
+        flash('This booking is already closed', 'error')
+        return redirect(url_for('user.paymentQR', recordId=parkingRecord.id))
+
     if request.method == 'POST':
-        currentExitTime = datetime.utcnow()
-        parkingRecord.exitTime = currentExitTime
-        parkingRecord.parkingSpot.status = 'A'
-        
-        totalHours = math.ceil((currentExitTime - parkingRecord.entryTime).total_seconds() / 3600)
-        calculatedAmount = totalHours * parkingRecord.bookingPrice
-        parkingRecord.totalAmountPaid = calculatedAmount
-        
-        db.session.commit()
+        closeParkingBooking(parkingRecord)
 
         return redirect(url_for('user.paymentQR', recordId=parkingRecord.id))
     
@@ -147,23 +184,59 @@ def paymentQR(recordId):
     
     calculatedAmount = parkingRecord.totalAmountPaid
     
-    upiPaymentString = f"upi://pay?pa=abhinavarya@oksbi&pn=Parking%20Payment&am={calculatedAmount}&cu=INR"
-    
-    qrCodeGenerator = qrcode.QRCode(version=1, box_size=10, border=5)
-    qrCodeGenerator.add_data(upiPaymentString)
-    qrCodeGenerator.make(fit=True)
+    # The QR image is fetched separately so the browser can cache it
+    return render_template('paymentQR.html', record=parkingRecord, amount=calculatedAmount, payee=UPI_PAYEE)
+
+@userBp.route('/payment-qr/<int:recordId>/qr.<imageFormat>')
+def paymentQRImage(recordId, imageFormat):
+    if imageFormat not in QR_FORMATS:
+        return "Unsupported image format", 404
     
-    qrCodeImage = qrCodeGenerator.make_image(fill_color="black", back_color="white")
+    parkingRecord = ParkingRecord.query.get(recordId)
+    if not parkingRecord:
+        return "Record not found", 404
     
-    imageBuffer = io.BytesIO()
-    qrCodeImage.save(imageBuffer, format='PNG')
-    qrCodeBase64 = base64.b64encode(imageBuffer.getvalue()).decode()
+    upiPaymentString = upi_payment_payload(parkingRecord.totalAmountPaid)
+    imageEtag = qr_etag(upiPaymentString, imageFormat)
+    if request.if_none_match.contains(imageEtag):
+        imageResponse = make_response('', 304)
+    else:
+        imageResponse = make_response(qr_image(upiPaymentString, imageFormat))
+        imageResponse.mimetype = QR_FORMATS[imageFormat]
     
-    return render_template('paymentQR.html', record=parkingRecord, amount=calculatedAmount, qr_code=qrCodeBase64)
+    # The amount changes at exit under the same URL, so always revalidate; an unchanged QR costs a 304
+    imageResponse.set_etag(imageEtag)
+    imageResponse.headers['Cache-Control'] = 'private, no-cache'
+    return imageResponse
+
+def serializeHistoryRecord(parkingRecord):
+    return {
+        'id': parkingRecord.id,
+        'vehicleNumber': parkingRecord.vehicleNumber,
+        'lotLocation': parkingRecord.lotLocation,
+        'entryTime': parkingRecord.entryTime.strftime('%Y-%m-%d %H:%M'),
+        'exitTime': parkingRecord.exitTime.strftime('%Y-%m-%d %H:%M') if parkingRecord.exitTime else None,
+        'totalAmountPaid': parkingRecord.totalAmountPaid,
+        'exitUrl': None if parkingRecord.exitTime else url_for('user.exit', recordId=parkingRecord.id)
+    }
 
 @userBp.route('/record')
 def record():
-    return render_template('record.html', history=current_user.parkingRecords)
+    historyPage, nextCursor = fetch_history_page(current_user.id)
+    return render_template('record.html', history=historyPage, nextCursor=nextCursor)
+
+@userBp.route('/api/history')
+def historyPage():
+    """Next page of the current user's history, used for infinite scroll."""
+    try:
+        historyRecords, nextCursor = fetch_history_page(current_user.id, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'records': [serializeHistoryRecord(parkingRecord) for parkingRecord in historyRecords],
+        'nextCursor': nextCursor
+    }), 200
 
 @userBp.route('/edit-profile', methods=['GET', 'POST'])
 def editProfile():
@@ -205,11 +278,42 @@ def editProfile():
             current_user.addressId = newAddressForUser.id
         
         db.session.commit()
+        identity_cache.invalidate(current_user.id)
         flash('Profile updated successfully!', 'success')
         return redirect(url_for('user.dashboard'))
     
     return render_template('userEditProfile.html', user=current_user)
 
+def nearbyLotsWithAvailability(latitude, longitude, radius, limit=None):
+    # Find parking lots within radius
+    nearby_lots = find_nearby_lots(latitude, longitude, radius)
+    
+    # Sort by proximity, keeping only the nearest `limit` lots if requested
+    sorted_lots = sort_by_proximity(nearby_lots, limit)
+    
+    # Format response with availability info
+    response_data = []
+    for item in sorted_lots:
+        lot = item['lot']
+        available_spots = lot.availableSpots
+        
+        response_data.append({
+            'lot': {
+                'id': lot.id,
+                'location': lot.location,
+                'address': lot.address.address,
+                'pincode': lot.address.pincode,
+                'price': lot.pricePerHour,
+                'total_spots': lot.totalSpots,
+                'latitude': lot.latitude,
+                'longitude': lot.longitude
+            },
+            'distance': item['distance'],
+            'available_spots': available_spots
+        })
+    
+    return response_data
+
 @userBp.route('/api/nearby-parking')
 def nearbyParking():
     """API endpoint to get nearby parking lots based on GPS coordinates."""
@@ -217,40 +321,12 @@ def nearbyParking():
         latitude = request.args.get('lat', type=float)
         longitude = request.args.get('lon', type=float)
         radius = request.args.get('radius', default=10, type=float)
+        limit = request.args.get('limit', type=int)
         
         if not latitude or not longitude:
             return jsonify({'error': 'Latitude and longitude are required'}), 400
         
-        # Find parking lots within radius
-        nearby_lots = find_nearby_lots(latitude, longitude, radius)
-        
-        # Sort by proximity
-        sorted_lots = sort_by_proximity(nearby_lots)
-        
-        # Format response with availability info
-        response_data = []
-        for item in sorted_lots:
-            lot = item['lot']
-            available_spots = ParkingSpot.query.filter_by(
-                lotId=lot.id, status='A'
-            ).count()
-            
-            response_data.append({
-                'lot': {
-                    'id': lot.id,
-                    'location': lot.location,
-                    'address': lot.address.address,
-                    'pincode': lot.address.pincode,
-                    'price': lot.pricePerHour,
-                    'total_spots': lot.totalSpots,
-                    'latitude': lot.latitude,
-                    'longitude': lot.longitude
-                },
-                'distance': item['distance'],
-                'available_spots': available_spots
-            })
-        
-        return jsonify(response_data), 200
+        return jsonify(nearbyLotsWithAvailability(latitude, longitude, radius, limit)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
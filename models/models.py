@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from functools import partial
+from flask import current_app
 from flask_login import UserMixin
+from utils.password_hashing import password_hasher
 
 db = SQLAlchemy()
 
@@ -11,6 +13,8 @@ class Address(db.Model):
     address = db.Column(db.String(255), nullable=False)
     pincode = db.Column(db.String(6), nullable=False)
 
+    __table_args__ = (db.Index('ix_address_pincode', 'pincode'),)
+
 class User(db.Model, UserMixin):
     __tablename__ = 'user'
     id = db.Column(db.Integer, primary_key=True)
@@ -27,12 +31,25 @@ class User(db.Model, UserMixin):
     address = db.relationship('Address', backref=db.backref('users', lazy=True))
 
     def setPassword(self, password):
-        self.passwordHash = generate_password_hash(password)
+        self.passwordHash = password_hasher.hash(password)
     
     def checkPassword(self, password):
-        if not self.passwordHash:
+        if not self.passwordHash or not password:
+            return False
+        if not password_hasher.verify(self.passwordHash, password):
             return False
-        return check_password_hash(self.passwordHash, password)
+        if password_hasher.needs_rehash(self.passwordHash):
+            # Upgrade to the configured hash parameters without delaying the login
+            password_hasher.rehash_async(
+                password, partial(storeRehashedPassword, current_app._get_current_object(), self.id, self.passwordHash)
+            )
+        return True
+
+def storeRehashedPassword(app, userId, oldHash, newHash):
+    """Replace a user's password hash, unless the password changed meanwhile."""
+    with app.app_context():
+        User.query.filter_by(id=userId, passwordHash=oldHash).update({'passwordHash': newHash})
+        db.session.commit()
 
 class ParkingLot(db.Model):
     __tablename__ = 'parking_lot'
@@ -44,8 +61,17 @@ class ParkingLot(db.Model):
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
 
+    # Denormalized counters kept in step with ParkingSpot.status
+    availableSpots = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    occupiedSpots = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     address = db.relationship('Address', backref=db.backref('parkingLots', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_parking_lot_lat_lon', 'latitude', 'longitude'),
+        db.Index('ix_parking_lot_address', 'addressId'),
+    )
+
 class ParkingSpot(db.Model):
     __tablename__ = 'parking_spot'
     id = db.Column(db.Integer, primary_key=True)
@@ -55,7 +81,11 @@ class ParkingSpot(db.Model):
 
     parkingLot = db.relationship('ParkingLot', backref=db.backref('parkingSpots', cascade='all, delete-orphan', lazy=True))
     
-    __table_args__ = (db.UniqueConstraint('lotId', 'spotNumber', name='_lot_spot_uc'),)
+    __table_args__ = (
+        db.UniqueConstraint('lotId', 'spotNumber', name='_lot_spot_uc'),
+        # Lowest free spot of a lot: WHERE lotId=? AND status='A' ORDER BY spotNumber
+        db.Index('ix_parking_spot_lot_status_number', 'lotId', 'status', 'spotNumber'),
+    )
 
 
 class ParkingRecord(db.Model):
@@ -78,3 +108,69 @@ class ParkingRecord(db.Model):
     user = db.relationship('User', backref=db.backref('parkingRecords', lazy=True))
     parkingLot = db.relationship('ParkingLot', backref=db.backref('parkingRecords', lazy=True))
     parkingSpot = db.relationship('ParkingSpot', backref=db.backref('parkingRecords', lazy=True))
+
+    __table_args__ = (
+        # History per user, keyset-paginated on (entryTime, id), and records
+        # per spot for spot deletion
+        db.Index('ix_parking_record_user_entry_id', 'userId', 'entryTime', 'id'),
+        db.Index('ix_parking_record_spot', 'spotId'),
+        db.Index('ix_parking_record_lot', 'lotId'),
+        db.Index('ix_parking_record_entry', 'entryTime'),
+        # Partial indexes holding only open sessions, so lookups of active
+        # bookings stay small however much closed history accumulates
+        db.Index('ix_parking_record_open_user', 'userId',
+                 sqlite_where=exitTime.is_(None), postgresql_where=exitTime.is_(None)),
+        db.Index('ix_parking_record_open_spot', 'spotId',
+                 sqlite_where=exitTime.is_(None), postgresql_where=exitTime.is_(None)),
+        # Archived records keep their ids, so SQLite must never hand a freed id out again
+        {'sqlite_autoincrement': True},
+    )
+
+
+# Closed ParkingRecords moved out of the live table by the archival job
+class ArchivedParkingRecord(db.Model):
+    __tablename__ = 'parking_record_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Keeps the original record id
+    userId = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    vehicleNumber = db.Column(db.String(15), nullable=False)
+    entryTime = db.Column(db.DateTime, nullable=False)
+    exitTime = db.Column(db.DateTime, nullable=False)
+
+    # Historical references only; the lot or spot may since have been deleted
+    lotId = db.Column(db.Integer, nullable=True)
+    spotId = db.Column(db.Integer, nullable=True)
+    bookingPrice = db.Column(db.Integer, nullable=False)
+    totalAmountPaid = db.Column(db.Integer, nullable=True, default=0)
+
+    lotLocation = db.Column(db.String(100), nullable=False)
+    lotAddress = db.Column(db.String(100), nullable=False)
+    lotPincode = db.Column("lotPin", db.String(6), nullable=False)
+
+    archivedAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_parking_record_archive_user_entry_id', 'userId', 'entryTime', 'id'),
+        db.Index('ix_parking_record_archive_exit', 'exitTime'),
+        db.Index('ix_parking_record_archive_lot', 'lotId'),
+    )
+
+
+# Per-lot usage aggregated into hourly ('H') and daily ('D') UTC buckets,
+# maintained on booking and exit and rebuilt by the backfill-rollups command
+class LotUsageRollup(db.Model):
+    __tablename__ = 'lot_usage_rollup'
+    id = db.Column(db.Integer, primary_key=True)
+    lotId = db.Column(db.Integer, nullable=False)  # No FK: rollups outlive deleted lots
+    period = db.Column(db.String(1), nullable=False)
+    bucketStart = db.Column(db.DateTime, nullable=False)
+
+    sessions = db.Column(db.Integer, nullable=False, default=0)  # Sessions that ended in the bucket
+    occupiedSeconds = db.Column(db.BigInteger, nullable=False, default=0)  # Parked time falling inside the bucket
+    revenue = db.Column(db.BigInteger, nullable=False, default=0)  # totalAmountPaid of sessions ended in the bucket
+    peakOccupancy = db.Column(db.Integer, nullable=False, default=0)  # Highest occupied count seen at a booking or exit
+
+    __table_args__ = (
+        db.UniqueConstraint('lotId', 'period', 'bucketStart', name='_lot_rollup_uc'),
+        # Date-range totals across all lots
+        db.Index('ix_lot_usage_rollup_period_bucket', 'period', 'bucketStart'),
+    )
@@ -1,5 +1,7 @@
 from app import createApp
 from models.models import db, User, Address, ParkingLot, ParkingSpot, ParkingRecord
+from utils.lot_counters import reconcile_lot_counters
+from utils.spot_provisioning import bulk_insert_spots
 from datetime import datetime, timedelta
 import random
 
@@ -190,16 +192,15 @@ def seed_database():
         ]
         
         # Create parking lots and spots
-        created_lots = []
-        for lot_data in parking_lots_data:
-            lot_address = Address(
-                address=lot_data['address'],
-                pincode=lot_data['pincode']
-            )
-            db.session.add(lot_address)
-            db.session.commit()
-            
-            parking_lot = ParkingLot(
+        lot_addresses = [
+            Address(address=lot_data['address'], pincode=lot_data['pincode'])
+            for lot_data in parking_lots_data
+        ]
+        db.session.add_all(lot_addresses)
+        db.session.flush()
+        
+        created_lots = [
+            ParkingLot(
                 location=lot_data['location'],
                 addressId=lot_address.id,
                 totalSpots=lot_data['spots'],
@@ -207,24 +208,23 @@ def seed_database():
                 latitude=lot_data['lat'],
                 longitude=lot_data['lon']
             )
-            db.session.add(parking_lot)
-            db.session.commit()
-            created_lots.append(parking_lot)
-            
-            # Create parking spots for this lot
+            for lot_data, lot_address in zip(parking_lots_data, lot_addresses)
+        ]
+        db.session.add_all(created_lots)
+        db.session.flush()
+        
+        # Create parking spots for all lots in one bulk insert
+        spot_rows = []
+        for lot_data, parking_lot in zip(parking_lots_data, created_lots):
             for spot_num in range(1, lot_data['spots'] + 1):
                 # Randomly make some spots occupied (20% occupancy)
                 status = 'O' if random.random() < 0.2 else 'A'
-                spot = ParkingSpot(
-                    lotId=parking_lot.id,
-                    spotNumber=spot_num,
-                    status=status
-                )
-                db.session.add(spot)
-            
-            db.session.commit()
+                spot_rows.append({'lotId': parking_lot.id, 'spotNumber': spot_num, 'status': status})
             print(f"✓ Created: {lot_data['location']} ({lot_data['spots']} spots)")
         
+        bulk_insert_spots(spot_rows)
+        db.session.commit()
+        
         print(f"\n✓ Total parking lots created: {len(created_lots)}")
         
         # Create some sample booking records
@@ -283,6 +283,8 @@ def seed_database():
             db.session.commit()
             print("✓ Sample bookings created")
         
+        # Spots were created with random statuses, so derive the lot counters
+        reconcile_lot_counters()
         db.session.commit()
         print("\n" + "="*60)
         print("✓ Database seeding completed successfully!")
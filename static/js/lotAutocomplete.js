@@ -0,0 +1,74 @@
+// Lot search suggestions for location inputs
+
+class LotAutocompleteService {
+  constructor(delay = 200) {
+    this.delay = delay;
+  }
+
+  /**
+   * Fetch ranked suggestions for a partial query
+   */
+  async fetchSuggestions(url, query) {
+    const response = await fetch(`${url}?q=${encodeURIComponent(query)}`, { credentials: 'same-origin' });
+
+    if (!response.ok) {
+      throw new Error('Failed to load suggestions');
+    }
+
+    const data = await response.json();
+    return data.suggestions;
+  }
+
+  /**
+   * Fill an input's datalist with suggestions as the user types
+   */
+  attach(input) {
+    const datalist = document.getElementById(input.getAttribute('list'));
+    let timer = null;
+    let latestQuery = '';
+
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      const query = input.value.trim();
+      if (query.length < 2) {
+        datalist.innerHTML = '';
+        return;
+      }
+
+      timer = setTimeout(async () => {
+        latestQuery = query;
+        try {
+          const suggestions = await this.fetchSuggestions(input.dataset.autocompleteUrl, query);
+          // Ignore responses that arrive after a newer query was sent
+          if (query !== latestQuery) {
+            return;
+          }
+          datalist.innerHTML = '';
+          suggestions.forEach(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion.location;
+            option.label = `${suggestion.address} (${suggestion.pincode})`;
+            datalist.appendChild(option);
+          });
+        } catch (error) {
+          datalist.innerHTML = '';
+        }
+      }, this.delay);
+    });
+  }
+
+  /**
+   * Attach to every input matching the selector
+   */
+  attachAll(selector) {
+    document.querySelectorAll(selector).forEach(input => this.attach(input));
+  }
+}
+
+// Initialize lot autocomplete service
+const lotAutocomplete = new LotAutocompleteService();
+
+// Export for use in other scripts
+if (typeof module !== 'undefined' && module.exports) {
+  module.exports = LotAutocompleteService;
+}
@@ -0,0 +1,118 @@
+// Lazily loaded parking spot grids for admin pages
+
+class SpotGridService {
+  /**
+   * Decode a base64 bitmap into a byte array
+   */
+  decodeBitmap(encoded) {
+    const raw = atob(encoded);
+    const bytes = new Uint8Array(raw.length);
+    for (let i = 0; i < raw.length; i++) {
+      bytes[i] = raw.charCodeAt(i);
+    }
+    return bytes;
+  }
+
+  /**
+   * Fetch a lot's packed spot bitmaps and expand them into spots
+   */
+  async fetchSpots(url) {
+    const response = await fetch(url, { credentials: 'same-origin' });
+
+    if (!response.ok) {
+      throw new Error('Failed to load parking spots');
+    }
+
+    const data = await response.json();
+    const existing = this.decodeBitmap(data.spots);
+    const occupied = this.decodeBitmap(data.occupied);
+    const isSet = (bits, index) => (bits[index >> 3] >> (index & 7)) & 1;
+
+    const spots = [];
+    for (let index = 0; index < data.maxSpotNumber; index++) {
+      if (isSet(existing, index)) {
+        spots.push({
+          lotId: data.lotId,
+          spotNumber: index + 1,
+          status: isSet(occupied, index) ? 'O' : 'A'
+        });
+      }
+    }
+    return spots;
+  }
+
+  /**
+   * Build the markup for a single spot
+   */
+  renderSpot(spot, adminActions) {
+    const title = `Spot #${spot.spotNumber}`;
+    const spotUrl = `/admin/lot/${spot.lotId}/spot/${spot.spotNumber}`;
+
+    if (spot.status === 'O') {
+      return `
+        <a href="${spotUrl}" class="btn btn-danger spot-btn"
+           title="${title}" style="background-color: red; border-color: red">O</a>
+      `;
+    }
+
+    if (!adminActions) {
+      return `
+        <a href="#" class="btn btn-success spot-btn" title="${title}"
+           style="background-color: green; border-color: green">A</a>
+      `;
+    }
+
+    return `
+      <form action="${spotUrl}/delete" method="post" class="d-inline"
+            onsubmit="return confirm('Delete this spot?');">
+        <button type="submit" class="btn btn-success spot-btn" title="${title}"
+                style="background-color: green; border-color: green">A</button>
+      </form>
+    `;
+  }
+
+  /**
+   * Load and render one grid container
+   */
+  async load(container, options = {}) {
+    try {
+      const spots = await this.fetchSpots(container.dataset.spotsUrl);
+      container.innerHTML = spots
+        .map(spot => this.renderSpot(spot, options.adminActions))
+        .join('');
+    } catch (error) {
+      container.innerHTML = `<span class="text-danger small">${error.message}</span>`;
+    }
+  }
+
+  /**
+   * Load each matching grid the first time it scrolls into view
+   */
+  observe(selector, options = {}) {
+    const containers = document.querySelectorAll(selector);
+
+    if (!('IntersectionObserver' in window)) {
+      containers.forEach(container => this.load(container, options));
+      return;
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+      entries.forEach(entry => {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          this.load(entry.target, options);
+        }
+      });
+    }, { rootMargin: '200px' });
+
+    containers.forEach(container => observer.observe(container));
+  }
+}
+
+// Initialize spot grid service
+const spotGrid = new SpotGridService();
+
+// Export for use in other scripts
+if (typeof module !== 'undefined' && module.exports) {
+  module.exports = SpotGridService;
+}
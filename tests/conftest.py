@@ -0,0 +1,59 @@
+import os
+import tempfile
+
+import pytest
+
+# config reads these at import time, so set them before the app is imported
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='parking_tests_'), 'test.db')
+os.environ['QUERY_COUNTER_ENABLED'] = 'true'
+
+from app import createApp
+from models.models import db, User, Address, ParkingLot
+from utils.identity_cache import identity_cache
+from utils.spatial_index import spatial_index
+
+@pytest.fixture
+def app():
+    """
+    Fresh app on an empty database. Requests must run outside app.app_context()
+    blocks, or they share that context's g and session.
+    """
+    app = createApp()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    identity_cache.configure(app.config['IDENTITY_CACHE_MAX_ENTRIES'], ttl=app.config['IDENTITY_CACHE_TTL'])
+    spatial_index.invalidate()
+
+def create_user(username, password, is_admin=False):
+    address = Address(address='Test Road', pincode='400001')
+    db.session.add(address)
+    db.session.flush()
+    user = User(username=username, name='Test', addressId=address.id, isAdmin=is_admin)
+    user.setPassword(password)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def create_lots(count, latitude=19.0760, longitude=72.8777):
+    """Add count 10-spot lots a few hundred metres apart around a point."""
+    lots = []
+    for i in range(count):
+        address = Address(address=f'Sector {i + 1}, Mumbai', pincode='400001')
+        db.session.add(address)
+        db.session.flush()
+        lots.append(ParkingLot(location=f'Test Lot {i + 1}', addressId=address.id, totalSpots=10,
+                               pricePerHour=50, availableSpots=10, occupiedSpots=0,
+                               latitude=latitude + i * 0.001, longitude=longitude))
+    db.session.add_all(lots)
+    db.session.commit()
+    spatial_index.invalidate()
+    return lots
+
+def login(app, username, password):
+    client = app.test_client()
+    response = client.post('/', data={'username': username, 'password': password})
+    assert response.status_code == 302
+    return client
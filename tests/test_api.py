@@ -0,0 +1,17 @@
+import pytest
+
+from conftest import create_user
+
+@pytest.mark.parametrize('url', ['/api/v1/auth/token', '/api/v1/auth/refresh', '/api/v1/bookings'])
+@pytest.mark.parametrize('body', [[1], 'lotId', 7])
+def test_json_body_must_be_an_object(app, url, body):
+    with app.app_context():
+        create_user('driver@example.com', 'driver-password')
+    client = app.test_client()
+    token = client.post('/api/v1/auth/token',
+                        json={'username': 'driver@example.com', 'password': 'driver-password'}).get_json()['access_token']
+
+    response = client.post(url, json=body, headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Expected a JSON object'}
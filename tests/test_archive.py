@@ -0,0 +1,21 @@
+import pytest
+
+from models.models import db
+from utils.archive import archive_closed_records
+from utils.schema_sync import ensure_record_ids_not_reused
+
+def test_archive_refuses_until_sqlite_stops_reusing_record_ids(app):
+    with app.app_context():
+        # parking_record as created before it was declared AUTOINCREMENT
+        connection = db.session.connection()
+        table_sql = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'parking_record'"
+        ).scalar()
+        connection.exec_driver_sql('DROP TABLE parking_record')
+        connection.exec_driver_sql(table_sql.replace('AUTOINCREMENT', ''))
+
+        with pytest.raises(RuntimeError, match='sync-schema'):
+            archive_closed_records(180)
+
+        assert ensure_record_ids_not_reused(connection)
+        assert archive_closed_records(180) == 0
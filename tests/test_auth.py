@@ -0,0 +1,30 @@
+from models.models import db, User, Address
+from utils.password_hashing import password_hasher, PasswordHashingBusy
+
+REGISTRATION = {
+    'username': 'new@example.com',
+    'password': 'new-password',
+    'name': 'New User',
+    'address': 'MG Road',
+    'pincode': '400001',
+}
+
+def test_register_creates_user_with_address(app):
+    response = app.test_client().post('/register', data=REGISTRATION)
+
+    assert response.status_code == 302
+    with app.app_context():
+        user = User.query.filter_by(username='new@example.com').one()
+        assert (user.address.address, user.address.pincode) == ('MG Road', '400001')
+
+def test_register_leaves_nothing_behind_when_hashing_is_busy(app, monkeypatch):
+    def busy(password):
+        raise PasswordHashingBusy('Too many password checks in progress')
+    monkeypatch.setattr(password_hasher, 'hash', busy)
+
+    response = app.test_client().post('/register', data=REGISTRATION)
+
+    assert response.status_code == 503
+    with app.app_context():
+        assert db.session.query(Address).count() == 0
+        assert db.session.query(User).count() == 0
@@ -0,0 +1,56 @@
+"""
+Concurrent bookings on one lot must never hand a spot out twice.
+
+The threaded counterpart of benchmarks/booking_stress.py, small enough to
+run with the suite against the conftest SQLite database.
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import create_user, create_lots
+from controllers.userController import createParkingBooking
+from models.models import db, ParkingLot, ParkingSpot, ParkingRecord
+from utils.spot_allocator import free_spot_pool, SpotAllocationBusy
+
+SPOTS = 10
+BOOKINGS = 40
+THREADS = 8
+
+@pytest.mark.parametrize('free_spot_cache', [False, True])
+def test_concurrent_bookings_never_share_a_spot(app, free_spot_cache):
+    app.config['FREE_SPOT_CACHE_ENABLED'] = free_spot_cache
+    free_spot_pool.invalidate()
+    with app.app_context():
+        user_id = create_user('driver@example.com', 'driver-password').id
+        lot = create_lots(1)[0]
+        lot_id = lot.id
+        lot.totalSpots = lot.availableSpots = SPOTS
+        db.session.add_all([ParkingSpot(lotId=lot_id, spotNumber=n, status='A') for n in range(1, SPOTS + 1)])
+        db.session.commit()
+
+    def book(index):
+        with app.app_context():
+            try:
+                record, _ = createParkingBooking(db.session.get(ParkingLot, lot_id), f'MH01AB{index:04d}', user_id)
+                return 'booked' if record else 'full'
+            except SpotAllocationBusy:
+                db.session.rollback()
+                return 'busy'
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        outcomes = Counter(pool.map(book, range(BOOKINGS)))
+
+    with app.app_context():
+        open_spot_ids = [spot_id for (spot_id,) in db.session.query(ParkingRecord.spotId).filter(
+            ParkingRecord.exitTime.is_(None)
+        )]
+        occupied = ParkingSpot.query.filter_by(lotId=lot_id, status='O').count()
+        lot = db.session.get(ParkingLot, lot_id)
+
+        assert set(outcomes) <= {'booked', 'full', 'busy'}
+        assert outcomes['booked'] == len(open_spot_ids) == occupied
+        assert len(set(open_spot_ids)) == len(open_spot_ids)
+        assert 0 < occupied <= SPOTS
+        assert (lot.occupiedSpots, lot.availableSpots) == (occupied, SPOTS - occupied)
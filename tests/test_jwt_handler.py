@@ -0,0 +1,27 @@
+import pytest
+
+from utils.jwt_handler import TokenSettings, generate_signing_key
+
+def token_config(key_dir, algorithm):
+    return {
+        'JWT_ALGORITHM': algorithm,
+        'JWT_KEY_DIR': str(key_dir),
+        'JWT_ACTIVE_KEY_ID': None,
+        'JWT_SECRET_KEY': 'test-secret',
+        'ACCESS_TOKEN_EXPIRE_MINUTES': 15,
+        'REFRESH_TOKEN_EXPIRE_DAYS': 7,
+    }
+
+@pytest.mark.parametrize('algorithm', ['RS256', 'EdDSA'])
+def test_asymmetric_settings_load_keys_on_first_use(tmp_path, algorithm):
+    # App start (and so the CLI) must not need a key yet
+    settings = TokenSettings(token_config(tmp_path, algorithm))
+    with pytest.raises(RuntimeError, match='generate-jwt-key'):
+        settings.encode({'user_id': 1})
+
+    key_id, _ = generate_signing_key(str(tmp_path), algorithm)
+    settings = TokenSettings(token_config(tmp_path, algorithm))
+    token = settings.encode({'user_id': 1})
+
+    assert settings.decode(token) == {'user_id': 1}
+    assert [key['kid'] for key in settings.jwks['keys']] == [key_id]
@@ -0,0 +1,26 @@
+from conftest import create_lots
+from models.models import db
+from utils.lot_search import search_lots, lot_search_cache
+from utils.search_index import _indexed_engines
+
+def test_catalogue_is_cached_until_invalidated(app):
+    with app.app_context():
+        create_lots(2)
+        assert len(search_lots()) == 2
+
+        # Added behind the cache's back: still served from the cached id list
+        create_lots(1)
+        assert len(search_lots()) == 2
+
+        lot_search_cache.invalidate()
+        assert len(search_lots()) == 3
+
+def test_search_falls_back_to_substring_match_without_the_index(app):
+    with app.app_context():
+        create_lots(3)
+        connection = db.session.connection()
+        connection.exec_driver_sql('DROP TABLE lot_search_vocab')
+        connection.exec_driver_sql('DROP TABLE lot_search_fts')
+        _indexed_engines.clear()
+
+        assert [lot.location for lot in search_lots('lot 2')] == ['Test Lot 2']
@@ -0,0 +1,32 @@
+from conftest import create_user, create_lots, login
+from controllers.userController import closeParkingBooking
+from models.models import db, ParkingSpot, ParkingRecord
+from utils.spot_provisioning import provision_spots
+
+def test_payment_qr_is_revalidated_and_changes_after_exit(app):
+    with app.app_context():
+        user = create_user('driver@example.com', 'driver-password')
+        lot = create_lots(1)[0]
+        provision_spots(lot.id, 1)
+        spot = ParkingSpot.query.filter_by(lotId=lot.id).one()
+        spot.status = 'O'
+        record = ParkingRecord(userId=user.id, vehicleNumber='MH01AB1234', lotId=lot.id, spotId=spot.id,
+                               bookingPrice=50, lotLocation=lot.location, lotAddress='Test Road',
+                               lotPincode='400001')
+        db.session.add(record)
+        db.session.commit()
+        record_id = record.id
+    client = login(app, 'driver@example.com', 'driver-password')
+    url = f'/user/payment-qr/{record_id}/qr.svg'
+
+    open_qr = client.get(url)
+    assert open_qr.status_code == 200
+    assert 'no-cache' in open_qr.headers['Cache-Control']
+    assert client.get(url, headers={'If-None-Match': open_qr.headers['ETag']}).status_code == 304
+
+    with app.app_context():
+        closeParkingBooking(db.session.get(ParkingRecord, record_id))
+
+    closed_qr = client.get(url, headers={'If-None-Match': open_qr.headers['ETag']})
+    assert closed_qr.status_code == 200
+    assert closed_qr.headers['ETag'] != open_qr.headers['ETag']
@@ -0,0 +1,47 @@
+"""
+Database round trips per request must not grow with the number of lots.
+
+Counts come from the X-DB-Queries header set by utils/query_counter.py.
+Each page is requested once before counting so lazily built in-process
+caches (identity cache, spatial index) do not skew the comparison.
+"""
+from conftest import create_user, create_lots, login
+from utils.query_counter import QUERY_COUNT_HEADER
+
+def query_count(client, url):
+    client.get(url)
+    response = client.get(url)
+    assert response.status_code == 200
+    return int(response.headers[QUERY_COUNT_HEADER])
+
+def test_admin_dashboard_query_count_is_independent_of_lot_count(app):
+    with app.app_context():
+        create_user('admin@example.com', 'admin-password', is_admin=True)
+    client = login(app, 'admin@example.com', 'admin-password')
+
+    with app.app_context():
+        create_lots(1)
+    one_lot = query_count(client, '/admin/')
+    with app.app_context():
+        create_lots(49)
+    fifty_lots = query_count(client, '/admin/')
+
+    assert one_lot > 0
+    assert fifty_lots == one_lot
+
+def test_nearby_parking_query_count_is_independent_of_lot_count(app):
+    with app.app_context():
+        create_user('driver@example.com', 'driver-password')
+    client = login(app, 'driver@example.com', 'driver-password')
+    url = '/user/api/nearby-parking?lat=19.0760&lon=72.8777&radius=20'
+
+    with app.app_context():
+        create_lots(1)
+    one_lot = query_count(client, url)
+    with app.app_context():
+        create_lots(49)
+    fifty_lots = query_count(client, url)
+
+    assert len(client.get(url).get_json()) == 50
+    assert one_lot > 0
+    assert fifty_lots == one_lot
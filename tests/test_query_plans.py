@@ -0,0 +1,11 @@
+from benchmarks.synthetic_data import generate_dataset
+from models.models import db
+from utils.query_plans import check_query_plans
+
+def test_hot_queries_use_an_index(app):
+    with app.app_context():
+        generate_dataset(lots=30, spots=10, users=50, records=2000, log=lambda message: None, allow_drop=True)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+        assert check_query_plans(log=lambda message: None) == []
@@ -0,0 +1,19 @@
+import time
+
+import pytest
+
+from utils.render_pool import RenderPool, RenderPoolBusy
+
+def test_saturated_pool_raises_instead_of_rendering_inline():
+    pool = RenderPool(workers=1, timeout=0.2)
+    try:
+        assert pool.run(pow, 2, 10, timeout=30) == 1024  # Start the worker process
+        with pytest.raises(RenderPoolBusy):
+            pool.run(time.sleep, 2)
+        assert pool.stats()['timeouts'] == 1
+        assert pool.stats()['fallbacks'] == 0
+    finally:
+        pool.shutdown()
+
+def test_disabled_pool_renders_inline():
+    assert RenderPool(workers=0).run(pow, 2, 10) == 1024
@@ -0,0 +1,15 @@
+from models.models import db
+from utils.schema_sync import sync_indexes
+
+def test_sync_indexes_drops_only_superseded_indexes(app):
+    with app.app_context():
+        connection = db.session.connection()
+        connection.execute(db.text('CREATE INDEX ix_parking_record_user_exit ON parking_record ("userId", "exitTime")'))
+        connection.execute(db.text('CREATE INDEX ix_parking_record_vehicle ON parking_record ("vehicleNumber")'))
+
+        created, dropped = sync_indexes(connection)
+        remaining = {index['name'] for index in db.inspect(connection).get_indexes('parking_record')}
+
+        assert (created, dropped) == (0, 1)
+        assert 'ix_parking_record_user_exit' not in remaining
+        assert 'ix_parking_record_vehicle' in remaining
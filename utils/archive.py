@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from models.models import db, ParkingRecord, ArchivedParkingRecord
+from utils.schema_sync import record_ids_reused
+
+def archive_closed_records(older_than_days, batch_size=5000, log=None):
+    """
+    Move records closed more than older_than_days ago into parking_record_archive.
+    
+    Each batch is copied with INSERT ... SELECT, deleted from the live table
+    and committed on its own, so locks on parking_record are held only for
+    one short batch at a time and the job can be interrupted and re-run.
+    
+    Args:
+        older_than_days: Archive records whose exitTime is older than this
+        batch_size: Records moved per transaction
+        log: Optional callable receiving progress messages
+    
+    Returns:
+        Number of records archived
+    
+    Raises:
+        RuntimeError: On a SQLite parking_record without AUTOINCREMENT, whose
+            new records could reuse archived ids; `flask sync-schema` fixes it
+    """
+    if record_ids_reused(db.session.connection()):
+        raise RuntimeError(
+            'parking_record would reuse the ids of archived records on this SQLite database; '
+            'run `flask sync-schema` before archiving'
+        )
+    
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    live = ParkingRecord.__table__
+    archive = ArchivedParkingRecord.__table__
+    columns = [column.name for column in archive.columns if column.name != 'archivedAt']
+    archive.create(db.session.connection(), checkfirst=True)
+    
+    archived = 0
+    while True:
+        # Closed before the cutoff implies entered before it, which the entryTime index serves
+        batch_ids = db.session.execute(
+            db.select(live.c.id)
+            .where(live.c.entryTime < cutoff, live.c.exitTime < cutoff)
+            .order_by(live.c.entryTime)
+            .limit(batch_size)
+        ).scalars().all()
+        if not batch_ids:
+            break
+        
+        archived_at = datetime.utcnow()
+        db.session.execute(archive.insert().from_select(
+            columns + ['archivedAt'],
+            db.select(*[live.c[name] for name in columns], db.literal(archived_at, db.DateTime))
+            .where(live.c.id.in_(batch_ids))
+        ))
+        db.session.execute(live.delete().where(live.c.id.in_(batch_ids)))
+        db.session.commit()
+        
+        archived += len(batch_ids)
+        if log:
+            log(f'Archived {archived} record(s)')
+    
+    return archived
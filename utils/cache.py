@@ -0,0 +1,151 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+class MemoryCacheBackend:
+    """
+    In-process LRU store with per-entry expiry.
+
+    Entries beyond max_entries are evicted least recently used first.
+    Counters (used for cache generations) are kept apart from the LRU so
+    they are never evicted.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self):
+        return len(self._entries)
+
+class RedisCacheBackend:
+    """
+    Shared store on a Redis server, so every worker sees the same entries
+    and invalidations. Requires the optional redis package.
+    """
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        data = self._client.get(key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(key, pickle.dumps(value), ex=max(int(ttl), 1))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def get_counter(self, key):
+        return int(self._client.get(key) or 0)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def size(self):
+        return None
+
+def backend_from_url(url, max_entries=1024):
+    """Build a cache backend from a 'memory://' or 'redis://host:port/db' URL."""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCacheBackend(url)
+    if url.startswith('memory://'):
+        return MemoryCacheBackend(max_entries)
+    raise ValueError(f'Unsupported cache URL: {url}')
+
+class QueryCache:
+    """
+    TTL cache for query results, namespaced and invalidated as a whole.
+
+    Keys embed a generation number held in the backend; invalidate() bumps
+    it, so every worker sharing the backend stops seeing older entries at
+    once and they age out through the TTL/LRU. With the in-process backend
+    other workers only catch up after ttl seconds.
+    """
+
+    def __init__(self, namespace, backend=None, ttl=300):
+        self.namespace = namespace
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _generation_key(self):
+        return f'{self.namespace}:generation'
+
+    def invalidate(self):
+        """Drop every cached result of this namespace."""
+        self.backend.incr(self._generation_key())
+
+    def get_or_set(self, key, loader):
+        """
+        Return the cached value for key, calling loader() on a miss.
+
+        Args:
+            key: Hashable description of the query (stringified into the cache key)
+            loader: Callable computing the value; None results are not cached
+        """
+        generation = self.backend.get_counter(self._generation_key())
+        full_key = f'{self.namespace}:{generation}:{key!r}'
+
+        value = self.backend.get(full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = loader()
+        if value is not None:
+            self.backend.set(full_key, value, self.ttl)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 4) if lookups else None,
+            'entries': self.backend.size()
+        }
@@ -0,0 +1,134 @@
+import csv
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+from models.models import db, ParkingRecord, ArchivedParkingRecord
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+# Rows fetched from the server-side cursor and written per chunk
+EXPORT_CHUNK_SIZE = 50000
+
+EXPORT_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('userId', pa.int64()),
+    ('vehicleNumber', pa.string()),
+    ('entryTime', pa.timestamp('us')),
+    ('exitTime', pa.timestamp('us')),
+    ('lotId', pa.int64()),
+    ('spotId', pa.int64()),
+    ('bookingPrice', pa.int64()),
+    ('totalAmountPaid', pa.int64()),
+    ('lotLocation', pa.string()),
+    ('lotAddress', pa.string()),
+    ('lotPincode', pa.string()),
+    ('archived', pa.bool_()),
+])
+
+def _record_query(model, archived, start, end, lot_id):
+    query = db.select(*[getattr(model, name).label(name) for name in EXPORT_SCHEMA.names[:-1]],
+                      db.literal(archived).label('archived'))
+    if start is not None:
+        query = query.where(model.entryTime >= start)
+    if end is not None:
+        query = query.where(model.entryTime < end)
+    if lot_id is not None:
+        query = query.where(model.lotId == lot_id)
+    return query
+
+def iter_record_chunks(start=None, end=None, lot_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream live and archived parking records in fixed-size chunks.
+
+    Rows are read through a server-side cursor on a dedicated connection
+    (psycopg2 named cursor on PostgreSQL), so at most one chunk is held in
+    memory whatever the size of the history.
+
+    Args:
+        start, end: Optional entryTime range [start, end)
+        lot_id: Optional parking lot filter
+        chunk_size: Rows per chunk
+
+    Yields:
+        Lists of row tuples in EXPORT_SCHEMA column order
+    """
+    with db.engine.connect() as connection:
+        streaming = connection.execution_options(yield_per=chunk_size)
+        for model, archived in ((ArchivedParkingRecord, True), (ParkingRecord, False)):
+            result = streaming.execute(_record_query(model, archived, start, end, lot_id))
+            for rows in result.partitions():
+                yield rows
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+def _csv_chunks(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_SCHEMA.names)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def _parquet_chunks(chunks):
+    # Each chunk becomes one row group; Parquet only appends, so bytes can leave as soon as they are written
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, EXPORT_SCHEMA, compression='zstd')
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows), EXPORT_SCHEMA)],
+                schema=EXPORT_SCHEMA
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def export_records(export_format, start=None, end=None, lot_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Encode live and archived parking history as CSV or Parquet.
+
+    Args:
+        export_format: 'csv' or 'parquet'
+        start, end: Optional entryTime range [start, end)
+        lot_id: Optional parking lot filter
+        chunk_size: Rows per chunk (one Parquet row group)
+
+    Yields:
+        Encoded file contents, one chunk at a time
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    chunks = iter_record_chunks(start, end, lot_id, chunk_size)
+    if export_format == 'parquet':
+        return _parquet_chunks(chunks)
+    return _csv_chunks(chunks)
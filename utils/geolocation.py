@@ -1,5 +1,11 @@
 from math import radians, sin, cos, sqrt, atan2
+import numpy as np
+from sqlalchemy.orm import joinedload
 from models.models import ParkingLot
+from utils.spatial_index import spatial_index, bounding_box
+
+# Earth's radius in kilometers
+EARTH_RADIUS_KM = 6371.0
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
@@ -12,8 +18,7 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     Returns:
         Distance in kilometers
     """
-    # Earth's radius in kilometers
-    R = 6371.0
+    R = EARTH_RADIUS_KM
     
     # Convert coordinates to radians
     lat1_rad = radians(lat1)
@@ -32,40 +37,101 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     distance = R * c
     return round(distance, 2)
 
-def find_nearby_lots(user_lat, user_lon, radius_km=10):
+def calculate_distances(origin_lat, origin_lon, lats, lons):
+    """
+    Vectorized Haversine distances from one or many origins to many points.
+    
+    Args:
+        origin_lat, origin_lon: Origin coordinates, scalars or 1-D arrays of length M
+        lats, lons: 1-D arrays of point coordinates of length N
+    
+    Returns:
+        Array of distances in kilometers (unrounded), shape (N,) for a scalar
+        origin or (M, N) for M origins
+    """
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    lat1 = np.radians(np.asarray(origin_lat, dtype=np.float64))
+    lon1 = np.radians(np.asarray(origin_lon, dtype=np.float64))
+    
+    # Broadcast many origins against all points
+    if lat1.ndim:
+        lat1 = lat1[:, np.newaxis]
+        lon1 = lon1[:, np.newaxis]
+    
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def find_nearby_lots(user_lat, user_lon, radius_km=10, use_index=True):
     """
     Find parking lots within a specified radius from user's location.
     
+    Candidates come from the in-memory spatial index (or, with
+    use_index=False, a bounding-box query on latitude/longitude), and their
+    distances are computed in one vectorized pass.
+    
     Args:
         user_lat: User's latitude
         user_lon: User's longitude
         radius_km: Search radius in kilometers (default: 10km)
+        use_index: Use the in-memory spatial index for the prefilter
     
     Returns:
         List of parking lots with distances
     """
-    all_lots = ParkingLot.query.all()
-    nearby_lots = []
-    
-    for lot in all_lots:
-        if lot.latitude and lot.longitude:
-            distance = calculate_distance(user_lat, user_lon, lot.latitude, lot.longitude)
-            if distance <= radius_km:
-                nearby_lots.append({
-                    'lot': lot,
-                    'distance': distance
-                })
-    
-    return nearby_lots
+    if use_index:
+        ids, lats, lons = spatial_index.candidates(user_lat, user_lon, radius_km)
+        distances = np.round(calculate_distances(user_lat, user_lon, lats, lons), 2)
+        within = distances <= radius_km
+        distance_by_id = dict(zip(ids[within].tolist(), distances[within].tolist()))
+        
+        if not distance_by_id:
+            return []
+        
+        lots = ParkingLot.query.options(joinedload(ParkingLot.address)).filter(
+            ParkingLot.id.in_(distance_by_id)
+        ).all()
+        return [{'lot': lot, 'distance': distance_by_id[lot.id]} for lot in lots]
+    
+    min_lat, max_lat, min_lon, max_lon = bounding_box(user_lat, user_lon, radius_km)
+    candidate_lots = ParkingLot.query.options(joinedload(ParkingLot.address)).filter(
+        ParkingLot.latitude.between(min_lat, max_lat),
+        ParkingLot.longitude.between(min_lon, max_lon)
+    ).all()
+    
+    distances = np.round(calculate_distances(
+        user_lat, user_lon,
+        [lot.latitude for lot in candidate_lots],
+        [lot.longitude for lot in candidate_lots]
+    ), 2).tolist()
+    
+    return [
+        {'lot': lot, 'distance': distance}
+        for lot, distance in zip(candidate_lots, distances)
+        if distance <= radius_km
+    ]
 
-def sort_by_proximity(lots_with_distance):
+def sort_by_proximity(lots_with_distance, limit=None):
     """
     Sort parking lots by distance from user.
     
     Args:
         lots_with_distance: List of dictionaries containing 'lot' and 'distance'
+        limit: Optional number of nearest lots to keep
     
     Returns:
         Sorted list by distance (nearest first)
     """
-    return sorted(lots_with_distance, key=lambda x: x['distance'])
+    distances = np.fromiter((item['distance'] for item in lots_with_distance),
+                            dtype=np.float64, count=len(lots_with_distance))
+    
+    # Partition out the k nearest before sorting only those
+    if limit is not None and 0 < limit < len(distances):
+        order = np.argpartition(distances, limit - 1)[:limit]
+        order = order[np.argsort(distances[order], kind='stable')]
+    else:
+        order = np.argsort(distances, kind='stable')
+        if limit is not None:
+            order = order[:max(limit, 0)]
+    
+    return [lots_with_distance[i] for i in order]
@@ -0,0 +1,62 @@
+import base64
+from datetime import datetime
+from models.models import db, ParkingRecord, ArchivedParkingRecord
+
+HISTORY_PAGE_SIZE = 20
+
+def encode_cursor(record):
+    """Encode a record's (entryTime, id) position as an opaque page cursor."""
+    raw = f'{record.entryTime.isoformat()}|{record.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """
+    Decode a page cursor.
+    
+    Returns:
+        Tuple (entryTime, id)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        entry_time, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(entry_time), int(record_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError('Invalid history cursor') from e
+
+def _page_query(model, user_id, position, limit):
+    query = model.query.filter(model.userId == user_id)
+    if position:
+        query = query.filter(db.tuple_(model.entryTime, model.id) < db.tuple_(*position))
+    return query.order_by(model.entryTime.desc(), model.id.desc()).limit(limit).all()
+
+def fetch_history_page(user_id, cursor=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Fetch one page of a user's parking history, newest first.
+    
+    Keyset pagination on (entryTime, id) walks the (userId, entryTime, id)
+    indexes of both the live and the archive table, so every page costs the
+    same regardless of how deep the user scrolls. Archived records keep
+    their original ids, so the two sources merge into one ordering.
+    
+    Args:
+        user_id: ID of the user
+        cursor: Cursor returned with the previous page, or None for the first
+        page_size: Number of records per page
+    
+    Returns:
+        Tuple (records, next_cursor); next_cursor is None on the last page
+    """
+    position = decode_cursor(cursor) if cursor else None
+    
+    records = _page_query(ParkingRecord, user_id, position, page_size + 1)
+    records += _page_query(ArchivedParkingRecord, user_id, position, page_size + 1)
+    records.sort(key=lambda record: (record.entryTime, record.id), reverse=True)
+    
+    next_cursor = None
+    if len(records) > page_size:
+        records = records[:page_size]
+        next_cursor = encode_cursor(records[-1])
+    
+    return records, next_cursor
@@ -0,0 +1,69 @@
+from sqlalchemy.orm import make_transient_to_detached
+from models.models import db, User
+from utils.cache import MemoryCacheBackend
+
+# Columns never copied into the cache; they are loaded on access instead
+_UNCACHED_COLUMNS = {'passwordHash'}
+
+class IdentityCache:
+    """
+    Short-lived cache of the users behind authenticated sessions.
+
+    Holds plain column snapshots in an in-process LRU, so a cached user is
+    attached to the request's session with no SELECT and behaves like any
+    loaded instance (edits are flushed, relationships lazy-load). Profile
+    edits invalidate their own worker's entry straight away; other workers
+    catch up within ttl seconds.
+    """
+
+    def __init__(self, max_entries=4096, ttl=60):
+        self.ttl = ttl
+        self.backend = MemoryCacheBackend(max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries, ttl):
+        self.ttl = ttl
+        self.backend = MemoryCacheBackend(max_entries)
+
+    def _snapshot(self, user):
+        return {
+            column.key: getattr(user, column.key)
+            for column in User.__mapper__.column_attrs
+            if column.key not in _UNCACHED_COLUMNS
+        }
+
+    def load(self, user_id):
+        """Return the User with user_id attached to the current session, or None."""
+        if self.ttl <= 0:
+            return db.session.get(User, user_id)
+
+        columns = self.backend.get(user_id)
+        if columns is None:
+            self.misses += 1
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self.backend.set(user_id, self._snapshot(user), self.ttl)
+            return user
+
+        self.hits += 1
+        user = User(**columns)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_id):
+        """Forget user_id so its next request reads the database."""
+        self.backend.delete(user_id)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'namespace': 'identity',
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 4) if lookups else None,
+            'entries': self.backend.size()
+        }
+
+# Backs the Flask-Login user loader; sized from IDENTITY_CACHE_* at app start
+identity_cache = IdentityCache()
@@ -1,7 +1,209 @@
+import os
+import threading
+import time
+from datetime import datetime
 import jwt
-from datetime import datetime, timedelta
+from jwt.algorithms import RSAAlgorithm, OKPAlgorithm
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ed25519
 from functools import wraps
 from flask import current_app, request, jsonify
+from utils.cache import MemoryCacheBackend
+
+# Public-key algorithms, the private key type each signs with and its JWK encoder
+ASYMMETRIC_ALGORITHMS = {
+    'RS256': (rsa.RSAPrivateKey, RSAAlgorithm),
+    'EdDSA': (ed25519.Ed25519PrivateKey, OKPAlgorithm),
+}
+
+RSA_KEY_SIZE = 2048
+
+def key_algorithm(private_key):
+    """JWT algorithm signing with private_key ('RS256' or 'EdDSA')."""
+    for algorithm, (key_type, _) in ASYMMETRIC_ALGORITHMS.items():
+        if isinstance(private_key, key_type):
+            return algorithm
+    raise ValueError(f'Unsupported JWT signing key type: {type(private_key).__name__}')
+
+def load_signing_keys(key_dir):
+    """
+    Read the PEM private keys in key_dir.
+
+    Returns:
+        Dict of key id (file name without .pem) -> private key, in file name order
+    """
+    if not os.path.isdir(key_dir):
+        return {}
+    keys = {}
+    for file_name in sorted(os.listdir(key_dir)):
+        if file_name.endswith('.pem'):
+            with open(os.path.join(key_dir, file_name), 'rb') as key_file:
+                keys[file_name[:-len('.pem')]] = serialization.load_pem_private_key(key_file.read(), password=None)
+    return keys
+
+def generate_signing_key(key_dir, algorithm='RS256', key_id=None):
+    """
+    Write a new private key for algorithm into key_dir.
+
+    Key ids default to a UTC timestamp, so the newest key sorts last.
+
+    Returns:
+        Tuple (key_id, path)
+    """
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Algorithm must be one of {', '.join(ASYMMETRIC_ALGORITHMS)}")
+
+    key_id = key_id or datetime.utcnow().strftime('%Y%m%d%H%M%S')
+    path = os.path.join(key_dir, f'{key_id}.pem')
+    if os.path.exists(path):
+        raise ValueError(f'Key {key_id} already exists')
+
+    if algorithm == 'RS256':
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=RSA_KEY_SIZE)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+
+    os.makedirs(key_dir, exist_ok=True)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as key_file:
+        key_file.write(pem)
+    return key_id, path
+
+class TokenSettings:
+    """
+    JWT keys, algorithm and lifetimes, read from the app config once.
+
+    HS256 signs and verifies with the shared JWT_SECRET_KEY. RS256 and
+    EdDSA sign with the active private key in JWT_KEY_DIR and verify with
+    the public half of any key there, matched on the token's kid header;
+    those public keys are published as a JWKS so gateways can verify
+    tokens without calling us. To rotate, add a key and restart the
+    workers; remove the old key once its refresh tokens have expired.
+    Keys are read on first use rather than at app start, so the CLI
+    (including `flask generate-jwt-key`) runs before any key exists.
+
+    Also holds the cache of verified tokens: a token seen before is
+    answered from memory until its exp passes, skipping the signature
+    check. Entries are keyed by the whole token, so a reused signature
+    with altered claims is still verified in full.
+    """
+
+    def __init__(self, config):
+        self.algorithm = config['JWT_ALGORITHM']
+        self.access_token_seconds = config['ACCESS_TOKEN_EXPIRE_MINUTES'] * 60
+        self.refresh_token_seconds = config['REFRESH_TOKEN_EXPIRE_DAYS'] * 24 * 3600
+
+        # kid -> (public key, [algorithm]); one algorithm per key rules out algorithm confusion
+        self.verification_keys = {}
+        self._jwks = {'keys': []}
+        self._keys_loaded = False
+        self._lock = threading.Lock()
+
+        if self.algorithm in ASYMMETRIC_ALGORITHMS:
+            self.key_dir = config['JWT_KEY_DIR']
+            self.active_key_id = config.get('JWT_ACTIVE_KEY_ID')
+            self.key_id = None
+            self.signing_key = None
+        elif self.algorithm == 'HS256':
+            self.key_id = None
+            self.signing_key = config['JWT_SECRET_KEY']
+            self._keys_loaded = True
+        else:
+            raise ValueError(f"JWT_ALGORITHM must be HS256 or one of {', '.join(ASYMMETRIC_ALGORITHMS)}")
+
+        cache_size = config.get('JWT_VERIFY_CACHE_SIZE', 0)
+        self.verified_tokens = MemoryCacheBackend(cache_size) if cache_size > 0 else None
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_keys(self):
+        if not self._keys_loaded:
+            with self._lock:
+                if not self._keys_loaded:
+                    self._load_key_pair()
+                    self._keys_loaded = True
+
+    def _load_key_pair(self):
+        key_dir = self.key_dir
+        private_keys = load_signing_keys(key_dir)
+        if not private_keys:
+            raise RuntimeError(
+                f'JWT_ALGORITHM={self.algorithm} needs a private key in {key_dir}; '
+                f'create one with `flask generate-jwt-key` first'
+            )
+
+        # The newest key signs unless JWT_ACTIVE_KEY_ID pins an older one,
+        # e.g. until gateways have picked up a freshly published key
+        self.key_id = self.active_key_id or list(private_keys)[-1]
+        if self.key_id not in private_keys:
+            raise RuntimeError(f'JWT_ACTIVE_KEY_ID {self.key_id} is not in {key_dir}')
+        self.signing_key = private_keys[self.key_id]
+        if key_algorithm(self.signing_key) != self.algorithm:
+            raise RuntimeError(f'Key {self.key_id} cannot sign {self.algorithm} tokens')
+
+        for key_id, private_key in private_keys.items():
+            algorithm = key_algorithm(private_key)
+            public_key = private_key.public_key()
+            self.verification_keys[key_id] = (public_key, [algorithm])
+
+            jwk = ASYMMETRIC_ALGORITHMS[algorithm][1].to_jwk(public_key, as_dict=True)
+            jwk.update({'kid': key_id, 'alg': algorithm, 'use': 'sig'})
+            self._jwks['keys'].append(jwk)
+
+    @property
+    def jwks(self):
+        """Public signing keys as a JWK set (empty for HS256)."""
+        self._ensure_keys()
+        return self._jwks
+
+    def encode(self, payload):
+        self._ensure_keys()
+        headers = {'kid': self.key_id} if self.key_id else None
+        return jwt.encode(payload, self.signing_key, algorithm=self.algorithm, headers=headers)
+
+    def decode(self, token):
+        """
+        Check token's signature and expiry.
+
+        Raises:
+            jwt.InvalidTokenError: If the token is malformed, expired, or
+                signed by an unknown key or with another algorithm
+        """
+        if self.algorithm == 'HS256':
+            return jwt.decode(token, self.signing_key, algorithms=[self.algorithm])
+
+        self._ensure_keys()
+
+        verification_key = self.verification_keys.get(jwt.get_unverified_header(token).get('kid'))
+        if verification_key is None:
+            raise jwt.InvalidSignatureError('Unknown signing key')
+        public_key, algorithms = verification_key
+        return jwt.decode(token, public_key, algorithms=algorithms)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'namespace': 'verified-tokens',
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 4) if lookups else None,
+            'entries': self.verified_tokens.size() if self.verified_tokens is not None else None
+        }
+
+def init_jwt(app):
+    """Bind the JWT settings of app; called from createApp."""
+    app.extensions['jwt'] = TokenSettings(app.config)
+    return app.extensions['jwt']
+
+def get_token_settings():
+    settings = current_app.extensions.get('jwt')
+    if settings is None:
+        settings = init_jwt(current_app._get_current_object())
+    return settings
 
 def create_access_token(user_id, is_admin=False):
     """
@@ -14,25 +216,18 @@ def create_access_token(user_id, is_admin=False):
     Returns:
         Encoded JWT token string
     """
-    expiration = datetime.utcnow() + timedelta(
-        minutes=current_app.config['ACCESS_TOKEN_EXPIRE_MINUTES']
-    )
+    settings = get_token_settings()
+    issued_at = int(time.time())
     
     payload = {
         'user_id': user_id,
         'is_admin': is_admin,
-        'exp': expiration,
-        'iat': datetime.utcnow(),
+        'exp': issued_at + settings.access_token_seconds,
+        'iat': issued_at,
         'type': 'access'
     }
     
-    token = jwt.encode(
-        payload,
-        current_app.config['JWT_SECRET_KEY'],
-        algorithm=current_app.config['JWT_ALGORITHM']
-    )
-    
-    return token
+    return settings.encode(payload)
 
 def create_refresh_token(user_id):
     """
@@ -44,29 +239,25 @@ def create_refresh_token(user_id):
     Returns:
         Encoded JWT token string
     """
-    expiration = datetime.utcnow() + timedelta(
-        days=current_app.config['REFRESH_TOKEN_EXPIRE_DAYS']
-    )
+    settings = get_token_settings()
+    issued_at = int(time.time())
     
     payload = {
         'user_id': user_id,
-        'exp': expiration,
-        'iat': datetime.utcnow(),
+        'exp': issued_at + settings.refresh_token_seconds,
+        'iat': issued_at,
         'type': 'refresh'
     }
     
-    token = jwt.encode(
-        payload,
-        current_app.config['JWT_SECRET_KEY'],
-        algorithm=current_app.config['JWT_ALGORITHM']
-    )
-    
-    return token
+    return settings.encode(payload)
 
 def verify_token(token, token_type='access'):
     """
     Verify and decode a JWT token.
     
+    Recently verified tokens are answered from the verified-token cache
+    until they expire.
+    
     Args:
         token: JWT token string
         token_type: Expected token type ('access' or 'refresh')
@@ -74,23 +265,33 @@ def verify_token(token, token_type='access'):
     Returns:
         Decoded payload dict if valid, None otherwise
     """
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['JWT_SECRET_KEY'],
-            algorithms=[current_app.config['JWT_ALGORITHM']]
-        )
-        
-        # Verify token type matches expected
-        if payload.get('type') != token_type:
+    if not token:
+        return None
+    
+    settings = get_token_settings()
+    cache = settings.verified_tokens
+    payload = cache.get(token) if cache is not None else None
+    
+    if payload is not None:
+        settings.hits += 1
+    else:
+        try:
+            payload = settings.decode(token)
+        except jwt.InvalidTokenError:
+            # Covers expired tokens (ExpiredSignatureError) too
             return None
-            
-        return payload
         
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
+        if cache is not None:
+            settings.misses += 1
+            expires_in = payload.get('exp', 0) - time.time()
+            if expires_in > 0:
+                cache.set(token, payload, expires_in)
+    
+    # Verify token type matches expected
+    if payload.get('type') != token_type:
         return None
+    
+    return dict(payload)
 
 def get_token_from_header():
     """
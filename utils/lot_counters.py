@@ -0,0 +1,53 @@
+from sqlalchemy import or_
+from models.models import db, ParkingLot, ParkingSpot
+
+def adjust_lot_counters(lot_id, available_delta=0, occupied_delta=0):
+    """
+    Shift a lot's denormalized availability counters.
+    
+    The change is applied as a single relative UPDATE in the current
+    transaction, so concurrent bookings and exits cannot overwrite each other.
+    
+    Args:
+        lot_id: ID of the parking lot
+        available_delta: Change to availableSpots
+        occupied_delta: Change to occupiedSpots
+    """
+    ParkingLot.query.filter_by(id=lot_id).update({
+        ParkingLot.availableSpots: ParkingLot.availableSpots + available_delta,
+        ParkingLot.occupiedSpots: ParkingLot.occupiedSpots + occupied_delta
+    }, synchronize_session=False)
+
+def reconcile_lot_counters(lot_ids=None):
+    """
+    Recompute availability counters from the parking_spot table.
+    
+    Args:
+        lot_ids: Optional list of lot IDs to repair (default: all lots)
+    
+    Returns:
+        Number of lots whose counters had drifted and were fixed
+    """
+    db.session.flush()
+    
+    available = db.session.query(db.func.count(ParkingSpot.id)).filter(
+        ParkingSpot.lotId == ParkingLot.id, ParkingSpot.status == 'A'
+    ).scalar_subquery()
+    occupied = db.session.query(db.func.count(ParkingSpot.id)).filter(
+        ParkingSpot.lotId == ParkingLot.id, ParkingSpot.status == 'O'
+    ).scalar_subquery()
+    
+    drift_query = db.session.query(ParkingLot.id).filter(
+        or_(ParkingLot.availableSpots != available, ParkingLot.occupiedSpots != occupied)
+    )
+    if lot_ids is not None:
+        drift_query = drift_query.filter(ParkingLot.id.in_(lot_ids))
+    drifted_ids = [row[0] for row in drift_query.all()]
+    
+    if drifted_ids:
+        ParkingLot.query.filter(ParkingLot.id.in_(drifted_ids)).update({
+            ParkingLot.availableSpots: available,
+            ParkingLot.occupiedSpots: occupied
+        }, synchronize_session='fetch')
+    
+    return len(drifted_ids)
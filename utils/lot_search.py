@@ -0,0 +1,83 @@
+from sqlalchemy.orm import joinedload
+from models.models import db, ParkingLot, Address
+from utils.cache import QueryCache
+from utils.search_index import match_lot_ids, search_vocabulary
+
+# Lots loaded per IN (...) query, well under SQLite's bound parameter limit
+LOAD_BATCH_SIZE = 1000
+
+# Suggestions returned by the autocomplete endpoint
+AUTOCOMPLETE_LIMIT = 8
+
+# Search results and suggestions; configured from CACHE_URL/LOT_SEARCH_CACHE_TTL at app start
+lot_search_cache = QueryCache('lot-search')
+
+def _vocabulary():
+    return lot_search_cache.get_or_set(('vocabulary',), search_vocabulary)
+
+def _catalogue_lot_ids():
+    return [row[0] for row in db.session.query(ParkingLot.id).order_by(ParkingLot.id).all()]
+
+def _matching_lot_ids(location, pincode):
+    if location:
+        return match_lot_ids(location, pincode or None, vocabulary=_vocabulary())
+    query = db.session.query(ParkingLot.id).join(Address).filter(Address.pincode == pincode)
+    return [row[0] for row in query.order_by(ParkingLot.id).all()]
+
+def load_lots(lot_ids):
+    """Fetch lots with their addresses by primary key, keeping the given order."""
+    lots_by_id = {}
+    for start in range(0, len(lot_ids), LOAD_BATCH_SIZE):
+        batch = lot_ids[start:start + LOAD_BATCH_SIZE]
+        for lot in ParkingLot.query.options(joinedload(ParkingLot.address)).filter(ParkingLot.id.in_(batch)):
+            lots_by_id[lot.id] = lot
+    return [lots_by_id[lot_id] for lot_id in lot_ids if lot_id in lots_by_id]
+
+def search_lots(location='', pincode=''):
+    """
+    Find parking lots by free-text location and/or exact pincode.
+
+    Only the ranked lot ids are cached, keyed by the normalised search
+    (the full catalogue, with no filters, under its own key); the lots
+    themselves are then loaded by primary key, so availability counters
+    are always current.
+
+    Args:
+        location: Free text matched against lot location and address
+        pincode: 6-digit pincode
+
+    Returns:
+        List of ParkingLot, best match first
+    """
+    location = ' '.join((location or '').lower().split())
+    pincode = (pincode or '').strip()
+
+    if not location and not pincode:
+        return load_lots(lot_search_cache.get_or_set(('catalogue',), _catalogue_lot_ids))
+
+    lot_ids = lot_search_cache.get_or_set(
+        ('lots', location, pincode),
+        lambda: _matching_lot_ids(location, pincode)
+    )
+    return load_lots(lot_ids)
+
+def autocomplete_lots(prefix, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Suggest lots for a partially typed query.
+
+    Returns:
+        List of dicts with id, location, address and pincode, best match first
+    """
+    prefix = ' '.join((prefix or '').lower().split())
+    if not prefix:
+        return []
+
+    def loadSuggestions():
+        return [{
+            'id': lot.id,
+            'location': lot.location,
+            'address': lot.address.address,
+            'pincode': lot.address.pincode
+        } for lot in load_lots(match_lot_ids(prefix, limit=limit, vocabulary=_vocabulary()))]
+
+    return lot_search_cache.get_or_set(('autocomplete', prefix, limit), loadSuggestions)
@@ -0,0 +1,131 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when more password hashes are waiting than the pool admits."""
+
+class PasswordHasher:
+    """
+    Password hashing on a small, bounded thread pool.
+
+    scrypt and pbkdf2 release the GIL, so hashing runs on at most workers
+    threads while request threads wait on the result; that caps the CPU a
+    login storm can take from other requests. At most max_pending hashes
+    may be running or queued, beyond which PasswordHashingBusy is raised
+    so callers can shed load. workers=0 hashes on the request thread.
+
+    method and salt_length are werkzeug's generate_password_hash arguments,
+    e.g. 'scrypt:16384:8:1' or 'pbkdf2:sha256:600000'. Hashes made with
+    other parameters still verify and are flagged by needs_rehash.
+    """
+
+    def __init__(self, method='scrypt', salt_length=16, workers=0, max_pending=32):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+        self._method_prefix = None
+        self._executor = None
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def configure(self, method, salt_length, workers, max_pending):
+        self.shutdown()
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending
+        self._method_prefix = None
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    def _submit(self, fn, *args):
+        if not self._pending.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHashingBusy('Too many password checks in progress')
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        return self._submit(fn, *args).result()
+
+    def hash(self, password):
+        """Hash password with the configured parameters."""
+        self.hashed += 1
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        """Check password against a hash made with any method werkzeug supports."""
+        self.verified += 1
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether password_hash was made with other parameters than the configured ones."""
+        if self._method_prefix is None:
+            # werkzeug fills in default parameters, e.g. 'scrypt' -> 'scrypt:32768:8:1'
+            self._method_prefix = generate_password_hash('', self.method, 1).split('$', 1)[0]
+        method_prefix, _, salt = password_hash.partition('$')
+        return method_prefix != self._method_prefix or len(salt.split('$', 1)[0]) != self.salt_length
+
+    def rehash_async(self, password, store):
+        """
+        Hash password with the current parameters in the background and
+        pass the new hash to store(). Skipped when the pool is busy; the
+        next login tries again. With workers=0 there is no pool, so the
+        rehash runs inline once, on that login. Failures are logged, never
+        raised to the login.
+        """
+        def rehash():
+            try:
+                store(generate_password_hash(password, self.method, self.salt_length))
+                self.rehashed += 1
+            except Exception:
+                logger.exception('Password rehash failed')
+
+        if self.workers <= 0:
+            rehash()
+            return
+        try:
+            self._submit(rehash)
+        except PasswordHashingBusy:
+            pass
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'maxPending': self.max_pending,
+            'hashed': self.hashed,
+            'verified': self.verified,
+            'rehashed': self.rehashed,
+            'rejected': self.rejected
+        }
+
+# Used by User.setPassword/checkPassword; configured from PASSWORD_HASH_* at app start
+password_hasher = PasswordHasher()
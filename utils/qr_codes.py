@@ -0,0 +1,80 @@
+import hashlib
+import io
+from urllib.parse import quote
+import qrcode
+from utils.cache import QueryCache, MemoryCacheBackend
+from utils.render_pool import render_pool
+
+UPI_PAYEE = 'abhinavarya@oksbi'
+UPI_PAYEE_NAME = 'Parking Payment'
+
+QR_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Rendered images kept per process; a payload's image never changes
+QR_CACHE_SIZE = 512
+QR_CACHE_TTL = 24 * 3600
+
+qr_cache = QueryCache('qr', MemoryCacheBackend(QR_CACHE_SIZE), ttl=QR_CACHE_TTL)
+
+def upi_payment_payload(amount, payee=UPI_PAYEE, payee_name=UPI_PAYEE_NAME):
+    """UPI deep link asking for amount (INR) to be paid to payee."""
+    return f'upi://pay?pa={payee}&pn={quote(payee_name)}&am={amount}&cu=INR'
+
+def qr_etag(payload, image_format):
+    """Validator for a rendered image, derived from its inputs so it is known without rendering."""
+    return hashlib.sha1(f'{image_format}:{payload}'.encode()).hexdigest()
+
+def _svg_from_matrix(matrix, box_size):
+    """Draw the dark modules as one path of horizontal runs."""
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                runs.append(f'M{start} {y}h{x - start}v1h{start - x}z')
+            else:
+                x += 1
+    size = len(matrix)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size * box_size}" height="{size * box_size}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path fill="#000" d="{"".join(runs)}"/></svg>'
+    ).encode()
+
+def render_qr(payload, image_format='png', box_size=10):
+    """
+    Render a QR code without caching.
+
+    Args:
+        payload: Data to encode
+        image_format: 'png', or 'svg' which skips rasterising and compression
+            and is written straight from the module matrix
+        box_size: Pixels per module
+
+    Returns:
+        Encoded image bytes
+    """
+    if image_format not in QR_FORMATS:
+        raise ValueError(f"QR format must be one of {', '.join(QR_FORMATS)}")
+
+    generator = qrcode.QRCode(version=1, box_size=box_size, border=5)
+    generator.add_data(payload)
+    generator.make(fit=True)
+
+    if image_format == 'svg':
+        return _svg_from_matrix(generator.get_matrix(), box_size)
+
+    buffer = io.BytesIO()
+    generator.make_image(fill_color='black', back_color='white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def qr_image(payload, image_format='png'):
+    """Rendered QR code for payload, from the LRU cache or else rendered in the render pool."""
+    return qr_cache.get_or_set((image_format, payload), lambda: render_pool.run(render_qr, payload, image_format))
@@ -0,0 +1,34 @@
+from flask import g, has_request_context
+from sqlalchemy import event
+from models.models import db
+
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+
+def request_query_count():
+    """Statements sent to the database so far by the current request."""
+    return g.get('db_queries', 0)
+
+def init_query_counter(app):
+    """
+    Report each response's database round trips in the X-DB-Queries header.
+
+    Only enabled in debug mode or with QUERY_COUNTER_ENABLED, so production
+    responses neither expose it nor pay for the cursor hook.
+    """
+    if not (app.debug or app.config.get('QUERY_COUNTER_ENABLED')):
+        return False
+
+    with app.app_context():
+        if not event.contains(db.engine, 'before_cursor_execute', _count_query):
+            event.listen(db.engine, 'before_cursor_execute', _count_query)
+
+    @app.after_request
+    def addQueryCount(response):
+        response.headers[QUERY_COUNT_HEADER] = str(request_query_count())
+        return response
+
+    return True
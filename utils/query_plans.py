@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from models.models import db, User, Address, ParkingLot, ParkingSpot, ParkingRecord, ArchivedParkingRecord, LotUsageRollup
+
+# EXPLAIN checks that the controllers' hot queries are served by an index.
+# Run by tests/test_query_plans.py and, on a larger dataset, benchmarks/query_plans.py.
+
+def hot_queries():
+    """
+    Return (name, statement, required_index) tuples mirroring the
+    controllers' hot queries. required_index, when set, must appear in the
+    plan.
+    """
+    since = datetime.utcnow() - timedelta(days=30)
+    return [
+        ('user.dashboard open bookings',
+         db.select(ParkingRecord).where(ParkingRecord.userId == 42, ParkingRecord.exitTime.is_(None)),
+         'ix_parking_record_open_user'),
+        ('user.record history page',
+         db.select(ParkingRecord).where(
+             ParkingRecord.userId == 42,
+             db.tuple_(ParkingRecord.entryTime, ParkingRecord.id) < db.tuple_(since, 10 ** 9)
+         ).order_by(ParkingRecord.entryTime.desc(), ParkingRecord.id.desc()).limit(21),
+         'ix_parking_record_user_entry_id'),
+        ('user.record archived history page',
+         db.select(ArchivedParkingRecord).where(
+             ArchivedParkingRecord.userId == 42,
+             db.tuple_(ArchivedParkingRecord.entryTime, ArchivedParkingRecord.id) < db.tuple_(since, 10 ** 9)
+         ).order_by(ArchivedParkingRecord.entryTime.desc(), ArchivedParkingRecord.id.desc()).limit(21),
+         'ix_parking_record_archive_user_entry_id'),
+        ('archive-records batch selection',
+         db.select(ParkingRecord.id).where(ParkingRecord.entryTime < since, ParkingRecord.exitTime < since)
+         .order_by(ParkingRecord.entryTime).limit(5000), None),
+        ('admin.spotDetails open record',
+         db.select(ParkingRecord).where(ParkingRecord.spotId == 42, ParkingRecord.exitTime.is_(None)),
+         'ix_parking_record_open_spot'),
+        ('admin.deleteParkingLot records of lot',
+         db.select(ParkingRecord.id).where(ParkingRecord.lotId == 7), None),
+        ('records by entry time range',
+         db.select(ParkingRecord.id).where(ParkingRecord.entryTime >= since), None),
+        ('allocate_spot lowest free spot',
+         db.select(ParkingSpot.id).where(ParkingSpot.lotId == 7, ParkingSpot.status == 'A')
+         .order_by(ParkingSpot.spotNumber).limit(1), None),
+        ('admin.lotSpots grid',
+         db.select(ParkingSpot.spotNumber, ParkingSpot.status).where(ParkingSpot.lotId == 7), None),
+        ('find_nearby_lots bounding box',
+         db.select(ParkingLot.id).where(ParkingLot.latitude.between(19.0, 19.2),
+                                        ParkingLot.longitude.between(72.8, 73.0)), None),
+        ('search by pincode',
+         db.select(ParkingLot).join(Address).where(Address.pincode == '400001'), None),
+        ('admin.summary rollup totals',
+         db.select(db.func.sum(LotUsageRollup.revenue)).where(
+             LotUsageRollup.period == 'D', LotUsageRollup.bucketStart >= since,
+             LotUsageRollup.bucketStart < datetime.utcnow()),
+         'ix_lot_usage_rollup_period_bucket'),
+        ('admin.analytics rollups of one lot',
+         db.select(LotUsageRollup).where(
+             LotUsageRollup.lotId == 7, LotUsageRollup.period == 'H', LotUsageRollup.bucketStart >= since), None),
+        ('backfill-rollups archived history of lots',
+         db.select(ArchivedParkingRecord.entryTime).where(ArchivedParkingRecord.lotId == 7), None),
+        ('auth.login by username',
+         db.select(User).where(User.username == 'user1@synthetic.test'), None),
+        ('auth.google_callback by google_id',
+         db.select(User).where(User.google_id == '1234567890'), None),
+    ]
+
+def explain(statement):
+    """Return the plan lines for a statement on the current database."""
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    if dialect.name == 'postgresql':
+        # Check that an index can serve the query, not the planner's choice on small data
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        rows = connection.exec_driver_sql('EXPLAIN ' + str(compiled), params).all()
+        return [row[0] for row in rows]
+
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).all()
+    return [row[-1] for row in rows]
+
+def full_scans(plan, dialect_name):
+    if dialect_name == 'postgresql':
+        return [line.strip() for line in plan if 'Seq Scan' in line]
+    return [line for line in plan if line.startswith('SCAN ')]
+
+def check_query_plans(log=print):
+    """
+    EXPLAIN every hot query and report full scans.
+
+    Returns:
+        List of (name, problems) for queries that regressed
+    """
+    dialect_name = db.session.get_bind().dialect.name
+    failures = []
+    for name, statement, required_index in hot_queries():
+        plan = explain(statement)
+        scans = full_scans(plan, dialect_name)
+        if required_index and not any(required_index in line for line in plan):
+            scans.append(f'{required_index} not used')
+        log(f"{'FAIL' if scans else 'ok  '}  {name}")
+        for line in plan:
+            log(f'        {line}')
+        if scans:
+            failures.append((name, scans))
+    db.session.rollback()
+    return failures
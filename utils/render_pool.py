@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+class RenderPoolBusy(RuntimeError):
+    """Raised when the render pool did not deliver a result within the timeout."""
+
+class RenderPool:
+    """
+    Process pool for CPU-bound rendering (QR codes, receipts, reports).
+
+    Work runs outside the request worker so its GIL stays free for other
+    requests. Each request waits at most timeout seconds for a result;
+    past that the pool is saturated and RenderPoolBusy is raised rather
+    than rendering inline, which would add CPU load exactly when there is
+    none to spare. Rendering is inline when the pool is disabled
+    (workers=0) or has crashed. Worker processes are spawned lazily on
+    first use and re-created after a fork, so the pool is safe to
+    configure before gunicorn forks its workers.
+
+    Spawned workers import the entry script. app.py builds the app at
+    import time (WSGI hosts need the module-level app), so the pool is
+    only used under a WSGI server or `flask run`; `python app.py` and
+    `python wsgi.py` disable it.
+    """
+
+    def __init__(self, workers=0, timeout=2.0):
+        self.workers = workers
+        self.timeout = timeout
+        self.submitted = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, workers, timeout):
+        self.shutdown()
+        self.workers = workers
+        self.timeout = timeout
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn, not fork: forking a threaded server can copy held locks into the child
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            self._executor = None
+
+    def run(self, fn, *args, timeout=None):
+        """
+        Run fn(*args) in the pool and return its result.
+
+        fn and args must be picklable (module-level functions).
+
+        Args:
+            timeout: Seconds to wait for the pool (default: the configured timeout)
+
+        Raises:
+            RenderPoolBusy: If no result arrived within the timeout
+        """
+        if self.workers <= 0:
+            return fn(*args)
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+            self.submitted += 1
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            # Drop the job if it has not started yet; the caller sheds the request
+            future.cancel()
+            self.timeouts += 1
+            raise RenderPoolBusy('Render pool is saturated')
+        except BrokenProcessPool:
+            self._reset()
+
+        self.fallbacks += 1
+        return fn(*args)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'submitted': self.submitted,
+            'timeouts': self.timeouts,
+            'fallbacks': self.fallbacks
+        }
+
+# Shared by every renderer; sized from RENDER_POOL_WORKERS at app start
+render_pool = RenderPool()
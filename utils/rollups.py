@@ -0,0 +1,251 @@
+from datetime import timedelta
+from sqlalchemy.dialects import postgresql, sqlite
+from models.models import db, ParkingLot, ParkingRecord, ArchivedParkingRecord, LotUsageRollup
+
+HOURLY = 'H'
+DAILY = 'D'
+
+def bucket_start(timestamp, period):
+    """Start of the hourly or daily UTC bucket containing timestamp."""
+    if period == DAILY:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def _add(buckets, lot_id, period, start, sessions=0, occupied_seconds=0, revenue=0, peak=0):
+    totals = buckets.setdefault((lot_id, period, start), [0, 0, 0, 0])
+    totals[0] += sessions
+    totals[1] += occupied_seconds
+    totals[2] += revenue
+    totals[3] = max(totals[3], peak)
+
+def _add_session(buckets, lot_id, entry_time, exit_time, amount):
+    """Spread a closed session's parked time over the hours it covered."""
+    cursor = entry_time
+    while cursor < exit_time:
+        hour = bucket_start(cursor, HOURLY)
+        segment_end = min(hour + timedelta(hours=1), exit_time)
+        seconds = int((segment_end - cursor).total_seconds())
+        _add(buckets, lot_id, HOURLY, hour, occupied_seconds=seconds)
+        _add(buckets, lot_id, DAILY, bucket_start(cursor, DAILY), occupied_seconds=seconds)
+        cursor = segment_end
+
+    # Sessions and revenue count towards the bucket the session ended in
+    for period in (HOURLY, DAILY):
+        _add(buckets, lot_id, period, bucket_start(exit_time, period), sessions=1, revenue=amount or 0)
+
+def _add_peak(buckets, lot_id, at, occupancy):
+    for period in (HOURLY, DAILY):
+        _add(buckets, lot_id, period, bucket_start(at, period), peak=occupancy)
+
+def _upsert(buckets):
+    """Add bucket totals onto existing rollup rows, creating missing ones."""
+    if not buckets:
+        return
+
+    table = LotUsageRollup.__table__
+    rows = [{
+        'lotId': lot_id, 'period': period, 'bucketStart': start,
+        'sessions': sessions, 'occupiedSeconds': occupied_seconds,
+        'revenue': revenue, 'peakOccupancy': peak
+    } for (lot_id, period, start), (sessions, occupied_seconds, revenue, peak) in buckets.items()]
+
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name in ('postgresql', 'sqlite'):
+        # One statement executed for every row, so it is compiled only once
+        insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+        statement = insert(table)
+        excluded = statement.excluded
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['lotId', 'period', 'bucketStart'],
+            set_={
+                'sessions': table.c.sessions + excluded.sessions,
+                'occupiedSeconds': table.c.occupiedSeconds + excluded.occupiedSeconds,
+                'revenue': table.c.revenue + excluded.revenue,
+                'peakOccupancy': db.case(
+                    (excluded.peakOccupancy > table.c.peakOccupancy, excluded.peakOccupancy),
+                    else_=table.c.peakOccupancy
+                )
+            }
+        ), rows)
+        return
+
+    for row in rows:
+        updated = db.session.execute(table.update().where(
+            table.c.lotId == row['lotId'],
+            table.c.period == row['period'],
+            table.c.bucketStart == row['bucketStart']
+        ).values(
+            sessions=table.c.sessions + row['sessions'],
+            occupiedSeconds=table.c.occupiedSeconds + row['occupiedSeconds'],
+            revenue=table.c.revenue + row['revenue'],
+            peakOccupancy=db.case(
+                (table.c.peakOccupancy < row['peakOccupancy'], row['peakOccupancy']),
+                else_=table.c.peakOccupancy
+            )
+        ))
+        if updated.rowcount == 0:
+            db.session.execute(table.insert().values(**row))
+
+def _current_occupancy(lot_id):
+    return db.session.query(ParkingLot.occupiedSpots).filter_by(id=lot_id).scalar() or 0
+
+def record_booking(lot_id, at):
+    """
+    Fold a new booking into the lot's rollups.
+
+    Call after the lot counters were incremented, in the booking's
+    transaction, so the occupancy peak includes the new session.
+    """
+    buckets = {}
+    _add_peak(buckets, lot_id, at, _current_occupancy(lot_id))
+    _upsert(buckets)
+
+def record_exit(parking_record):
+    """
+    Fold a closed session into the lot's rollups.
+
+    Call before the lot counters are decremented, in the exit's
+    transaction, so the occupancy peak still includes the leaving session.
+
+    Args:
+        parking_record: ParkingRecord with exitTime and totalAmountPaid set
+    """
+    if parking_record.lotId is None:
+        return
+
+    buckets = {}
+    _add_peak(buckets, parking_record.lotId, parking_record.exitTime, _current_occupancy(parking_record.lotId))
+    _add_session(buckets, parking_record.lotId, parking_record.entryTime,
+                 parking_record.exitTime, parking_record.totalAmountPaid)
+    _upsert(buckets)
+
+def _lot_buckets(lot_id, sessions):
+    """Rebuild one lot's buckets from its (entryTime, exitTime, totalAmountPaid) rows."""
+    buckets = {}
+    events = []
+    for entry_time, exit_time, amount in sessions:
+        events.append((entry_time, 1))
+        if exit_time is not None:
+            events.append((exit_time, -1))
+            _add_session(buckets, lot_id, entry_time, exit_time, amount)
+
+    # Replay bookings and exits in order, exits first on ties, as the live path sees them
+    occupancy = 0
+    for at, delta in sorted(events):
+        if delta > 0:
+            occupancy += 1
+            _add_peak(buckets, lot_id, at, occupancy)
+        else:
+            _add_peak(buckets, lot_id, at, occupancy)
+            occupancy -= 1
+    return buckets
+
+def backfill_rollups(lots_per_batch=200, log=None):
+    """
+    Rebuild rollups from live and archived parking history.
+
+    Lots are processed in batches: each batch's history is read, its rollup
+    rows are replaced and the batch is committed, so the job can be re-run
+    and only briefly touches any one lot. Rollups of lots whose history no
+    longer references them (deleted lots) are left as they are.
+
+    Args:
+        lots_per_batch: Lots rebuilt per transaction
+        log: Optional callable receiving progress messages
+
+    Returns:
+        Number of lots rebuilt
+    """
+    live = ParkingRecord.__table__
+    archive = ArchivedParkingRecord.__table__
+    rollups = LotUsageRollup.__table__
+    connection = db.session.connection()
+    archive.create(connection, checkfirst=True)
+    rollups.create(connection, checkfirst=True)
+
+    lot_ids = sorted(set(db.session.execute(
+        db.union(
+            db.select(live.c.lotId).where(live.c.lotId.isnot(None)),
+            db.select(archive.c.lotId).where(archive.c.lotId.isnot(None))
+        )
+    ).scalars()))
+
+    rebuilt = 0
+    for start in range(0, len(lot_ids), lots_per_batch):
+        batch_ids = lot_ids[start:start + lots_per_batch]
+        history = {lot_id: [] for lot_id in batch_ids}
+        for table in (live, archive):
+            for lot_id, entry_time, exit_time, amount in db.session.execute(
+                db.select(table.c.lotId, table.c.entryTime, table.c.exitTime, table.c.totalAmountPaid)
+                .where(table.c.lotId.in_(batch_ids))
+            ):
+                history[lot_id].append((entry_time, exit_time, amount))
+
+        buckets = {}
+        for lot_id, sessions in history.items():
+            buckets.update(_lot_buckets(lot_id, sessions))
+
+        db.session.execute(rollups.delete().where(rollups.c.lotId.in_(batch_ids)))
+        _upsert(buckets)
+        db.session.commit()
+
+        rebuilt += len(batch_ids)
+        if log:
+            log(f'Rebuilt rollups for {rebuilt}/{len(lot_ids)} lot(s)')
+
+    return rebuilt
+
+def _rollup_query(columns, start, end, period, lot_id):
+    query = db.session.query(*columns).filter(
+        LotUsageRollup.period == period,
+        LotUsageRollup.bucketStart >= start,
+        LotUsageRollup.bucketStart < end
+    )
+    if lot_id is not None:
+        query = query.filter(LotUsageRollup.lotId == lot_id)
+    return query
+
+def rollup_series(start, end, period=DAILY, lot_id=None):
+    """
+    Usage per bucket in [start, end), summed across lots unless lot_id is given.
+
+    peakOccupancy is the highest single-lot peak in each bucket.
+
+    Returns:
+        List of dicts ordered by bucketStart
+    """
+    rows = _rollup_query([
+        LotUsageRollup.bucketStart,
+        db.func.sum(LotUsageRollup.sessions),
+        db.func.sum(LotUsageRollup.occupiedSeconds),
+        db.func.sum(LotUsageRollup.revenue),
+        db.func.max(LotUsageRollup.peakOccupancy)
+    ], start, end, period, lot_id).group_by(LotUsageRollup.bucketStart).order_by(LotUsageRollup.bucketStart).all()
+
+    return [{
+        'bucketStart': bucket,
+        'sessions': int(sessions),
+        'occupiedHours': round(int(occupied_seconds) / 3600, 2),
+        'revenue': int(revenue),
+        'peakOccupancy': int(peak)
+    } for bucket, sessions, occupied_seconds, revenue, peak in rows]
+
+def rollup_totals(start, end, lot_id=None):
+    """
+    Usage totals over the whole days [start, end).
+
+    peakOccupancy is the highest single-lot peak in the range.
+    """
+    sessions, occupied_seconds, revenue, peak = _rollup_query([
+        db.func.coalesce(db.func.sum(LotUsageRollup.sessions), 0),
+        db.func.coalesce(db.func.sum(LotUsageRollup.occupiedSeconds), 0),
+        db.func.coalesce(db.func.sum(LotUsageRollup.revenue), 0),
+        db.func.coalesce(db.func.max(LotUsageRollup.peakOccupancy), 0)
+    ], bucket_start(start, DAILY), bucket_start(end, DAILY), DAILY, lot_id).one()
+
+    return {
+        'sessions': int(sessions),
+        'occupiedHours': round(int(occupied_seconds) / 3600, 2),
+        'revenue': int(revenue),
+        'peakOccupancy': int(peak)
+    }
@@ -0,0 +1,166 @@
+from sqlalchemy.schema import CreateColumn
+from models.models import db, ParkingLot, ParkingRecord, ArchivedParkingRecord
+from utils.lot_counters import reconcile_lot_counters
+from utils.search_index import ensure_search_index
+
+# Indexes earlier versions of the models declared and later replaced. Only
+# these are dropped, so indexes operators added themselves are left alone.
+SUPERSEDED_INDEXES = frozenset({
+    'ix_parking_record_user_exit',
+    'ix_parking_record_spot_exit',
+    'ix_parking_record_user_entry',
+})
+
+def _log(log, message):
+    if log:
+        log(message)
+
+def create_missing_tables(connection, log=None):
+    """Create model tables that do not exist yet, with their indexes."""
+    existing_tables = set(db.inspect(connection).get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            table.create(connection)
+            created.append(table.name)
+            _log(log, f'Created table {table.name}')
+    return created
+
+def add_missing_columns(connection, log=None):
+    """
+    Add model columns missing from existing tables.
+
+    New NOT NULL columns need a server_default so existing rows get a value.
+
+    Returns:
+        List of 'table.column' names added
+    """
+    inspector = db.inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f'Cannot add NOT NULL column {table.name}.{column.name} without a server default')
+            column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            table_name = connection.dialect.identifier_preparer.format_table(table)
+            connection.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN {column_ddl}'))
+            added.append(f'{table.name}.{column.name}')
+            _log(log, f'Added column {table.name}.{column.name}')
+    return added
+
+def record_ids_reused(connection):
+    """Whether SQLite may hand out ids of archived parking records again (no AUTOINCREMENT)."""
+    if connection.dialect.name != 'sqlite':
+        return False
+    table_sql = connection.execute(
+        db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': ParkingRecord.__tablename__}
+    ).scalar()
+    return 'AUTOINCREMENT' not in (table_sql or '').upper()
+
+def ensure_record_ids_not_reused(connection, log=None):
+    """
+    SQLite only: make parking_record AUTOINCREMENT and start its id
+    sequence above every archived id.
+
+    Without AUTOINCREMENT SQLite reuses ids once the highest rows are
+    archived, which collides with the ids kept in the archive. SQLite
+    cannot alter that on a table, so an old parking_record is rebuilt.
+
+    Returns:
+        True if the table was rebuilt
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+
+    live = ParkingRecord.__table__
+    rebuilt = record_ids_reused(connection)
+    if rebuilt:
+        old_name = f'{live.name}_rebuild'
+        columns = ', '.join(f'"{column.name}"' for column in live.columns)
+        connection.execute(db.text(f'ALTER TABLE "{live.name}" RENAME TO "{old_name}"'))
+        # Index names are global in SQLite; free them for the new table
+        for index in db.inspect(connection).get_indexes(old_name):
+            connection.execute(db.text(f'DROP INDEX "{index["name"]}"'))
+        live.create(connection)
+        connection.execute(db.text(f'INSERT INTO "{live.name}" ({columns}) SELECT {columns} FROM "{old_name}"'))
+        connection.execute(db.text(f'DROP TABLE "{old_name}"'))
+        _log(log, f'Rebuilt {live.name} with AUTOINCREMENT ids')
+
+    highest_id = max(
+        connection.execute(db.select(db.func.max(live.c.id))).scalar() or 0,
+        connection.execute(db.select(db.func.max(ArchivedParkingRecord.__table__.c.id))).scalar() or 0
+    )
+    sequence = connection.execute(
+        db.text('SELECT seq FROM sqlite_sequence WHERE name = :name'), {'name': live.name}
+    ).first()
+    if sequence is None:
+        connection.execute(db.text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)'),
+                           {'name': live.name, 'seq': highest_id})
+    elif sequence[0] < highest_id:
+        connection.execute(db.text('UPDATE sqlite_sequence SET seq = :seq WHERE name = :name'),
+                           {'name': live.name, 'seq': highest_id})
+    return rebuilt
+
+def sync_indexes(connection, log=None):
+    """
+    Create indexes declared on the models and drop the SUPERSEDED_INDEXES.
+
+    Returns:
+        Tuple (created, dropped) index counts
+    """
+    inspector = db.inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    created = dropped = 0
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        declared_indexes = {index.name: index for index in table.indexes}
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for name, index in declared_indexes.items():
+            if name not in existing_indexes:
+                index.create(connection)
+                created += 1
+                _log(log, f'Created {name}')
+        for name in sorted(existing_indexes & SUPERSEDED_INDEXES):
+            connection.execute(db.text(f'DROP INDEX "{name}"'))
+            dropped += 1
+            _log(log, f'Dropped {name}')
+    ensure_search_index(connection)
+    return created, dropped
+
+def sync_schema(connection, log=None):
+    """
+    Bring an existing database up to the models, idempotently.
+
+    Creates missing tables, adds missing columns, backfills the lot
+    availability counters when they were just added, stops SQLite from
+    reusing parking record ids, then syncs indexes.
+    Runs in the caller's transaction; the caller commits.
+
+    Returns:
+        Dict with created tables, added columns and index counts
+    """
+    created_tables = create_missing_tables(connection, log)
+    added_columns = add_missing_columns(connection, log)
+
+    counter_columns = {f'{ParkingLot.__tablename__}.availableSpots', f'{ParkingLot.__tablename__}.occupiedSpots'}
+    if counter_columns & set(added_columns):
+        repaired_lots = reconcile_lot_counters()
+        _log(log, f'Backfilled spot counters for {repaired_lots} parking lot(s)')
+
+    rebuilt = ensure_record_ids_not_reused(connection, log)
+    created_indexes, dropped_indexes = sync_indexes(connection, log)
+    return {
+        'tables': created_tables,
+        'columns': added_columns,
+        'rebuiltRecords': rebuilt,
+        'indexesCreated': created_indexes,
+        'indexesDropped': dropped_indexes
+    }
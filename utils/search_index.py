@@ -0,0 +1,219 @@
+import difflib
+import logging
+import re
+from sqlalchemy import event
+from models.models import db, ParkingLot, Address
+
+logger = logging.getLogger(__name__)
+
+# Query terms shorter than this are only prefix-matched, never typo-corrected
+MIN_CORRECTION_LENGTH = 3
+
+# Minimum difflib similarity for a misspelt term to be replaced
+CORRECTION_CUTOFF = 0.75
+
+# bm25 column weights: location, address, pincode
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lot_search_fts USING fts5("
+    "location, address, pincode, prefix='1 2 3', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lot_search_vocab USING fts5vocab(lot_search_fts, 'row')",
+    # Triggers keep the index in step with every write path, bulk inserts included
+    "CREATE TRIGGER IF NOT EXISTS lot_search_ai AFTER INSERT ON parking_lot BEGIN "
+    "INSERT INTO lot_search_fts(rowid, location, address, pincode) "
+    "SELECT new.id, new.location, address.address, address.pincode FROM address WHERE address.id = new.\"addressId\"; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS lot_search_ad AFTER DELETE ON parking_lot BEGIN "
+    "DELETE FROM lot_search_fts WHERE rowid = old.id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS lot_search_au AFTER UPDATE OF location, \"addressId\" ON parking_lot BEGIN "
+    "DELETE FROM lot_search_fts WHERE rowid = old.id; "
+    "INSERT INTO lot_search_fts(rowid, location, address, pincode) "
+    "SELECT new.id, new.location, address.address, address.pincode FROM address WHERE address.id = new.\"addressId\"; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS lot_search_address_au AFTER UPDATE OF address, pincode ON address BEGIN "
+    "DELETE FROM lot_search_fts WHERE rowid IN (SELECT id FROM parking_lot WHERE \"addressId\" = new.id); "
+    "INSERT INTO lot_search_fts(rowid, location, address, pincode) "
+    "SELECT parking_lot.id, parking_lot.location, new.address, new.pincode FROM parking_lot WHERE \"addressId\" = new.id; "
+    "END",
+]
+
+_SQLITE_POPULATE = (
+    "INSERT INTO lot_search_fts(rowid, location, address, pincode) "
+    "SELECT parking_lot.id, parking_lot.location, address.address, address.pincode "
+    "FROM parking_lot JOIN address ON address.id = parking_lot.\"addressId\""
+)
+
+# Trigram indexes for substring search; not declared on the models
+_POSTGRESQL_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS trgm_parking_lot_location ON parking_lot USING gin (lower(location) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS trgm_address_address ON address USING gin (lower(address) gin_trgm_ops)',
+]
+
+def ensure_search_index(connection, rebuild=False):
+    """
+    Create the lot search index if it is missing.
+
+    SQLite gets an FTS5 table fed by triggers, PostgreSQL gets pg_trgm
+    GIN indexes; other databases fall back to substring scans.
+
+    Args:
+        connection: Connection to run the DDL on
+        rebuild: Drop and repopulate the SQLite FTS table
+
+    Returns:
+        True if a search index is available on this database
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == 'postgresql':
+        for statement in _POSTGRESQL_DDL:
+            connection.exec_driver_sql(statement)
+        return True
+
+    if dialect_name != 'sqlite':
+        return False
+
+    if rebuild:
+        connection.exec_driver_sql('DROP TABLE IF EXISTS lot_search_vocab')
+        connection.exec_driver_sql('DROP TABLE IF EXISTS lot_search_fts')
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lot_search_fts'"
+    ).first() is not None
+    for statement in _SQLITE_DDL:
+        connection.exec_driver_sql(statement)
+    if not exists:
+        connection.exec_driver_sql(_SQLITE_POPULATE)
+    return True
+
+# Engines whose search index was found; others are checked again on each search
+_indexed_engines = set()
+_warned_engines = set()
+
+def search_index_available():
+    """
+    Whether the current database has the lot search index.
+
+    Databases created before the index only get it from sync-schema,
+    sync-indexes or rebuild-search-index; until then searches fall back
+    to substring scans instead of failing.
+    """
+    engine = db.session.get_bind()
+    if engine in _indexed_engines:
+        return True
+
+    dialect_name = engine.dialect.name
+    if dialect_name == 'sqlite':
+        sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lot_search_vocab'"
+    elif dialect_name == 'postgresql':
+        sql = "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+    else:
+        return False
+
+    if db.session.execute(db.text(sql)).first() is None:
+        if engine not in _warned_engines:
+            _warned_engines.add(engine)
+            logger.warning('Lot search index missing; run `flask sync-schema`. Using substring search until then')
+        return False
+    _indexed_engines.add(engine)
+    return True
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_search_index(target, connection, tables=(), **kw):
+    # A freshly created parking_lot table means any old FTS rows are stale
+    created = {table.name for table in tables}
+    ensure_search_index(connection, rebuild='parking_lot' in created)
+
+def _terms(text):
+    return re.findall(r'\w+', text.lower())
+
+def _fts_term(term, vocabulary):
+    """FTS5 expression for one query term: a prefix match, or close spellings of it."""
+    if term.isdigit() or len(term) < MIN_CORRECTION_LENGTH or any(word.startswith(term) for word in vocabulary):
+        return f'"{term}"*'
+
+    prefixes = {word[:len(term)] for word in vocabulary if len(word) >= len(term)}
+    corrections = difflib.get_close_matches(term, prefixes, n=3, cutoff=CORRECTION_CUTOFF)
+    if not corrections:
+        return f'"{term}"*'
+    return '(' + ' OR '.join(f'"{correction}"*' for correction in corrections) + ')'
+
+def search_vocabulary():
+    """Alphabetic terms in the SQLite search index, used for typo correction."""
+    if db.session.get_bind().dialect.name != 'sqlite' or not search_index_available():
+        return []
+    rows = db.session.execute(db.text("SELECT term FROM lot_search_vocab WHERE term >= 'a'"))
+    return [term for (term,) in rows if term.isalpha()]
+
+def _sqlite_matches(text, pincode, limit, vocabulary):
+    expression = ' AND '.join(_fts_term(term, vocabulary) for term in _terms(text))
+    sql = ('SELECT rowid FROM lot_search_fts WHERE lot_search_fts MATCH :expression'
+           + (' AND pincode = :pincode' if pincode else '')
+           + ' ORDER BY bm25(lot_search_fts, {}, {}, {}), rowid'.format(*FTS_WEIGHTS)
+           + (' LIMIT :limit' if limit else ''))
+    rows = db.session.execute(db.text(sql), {'expression': expression, 'pincode': pincode, 'limit': limit})
+    return [row[0] for row in rows]
+
+def _postgresql_matches(text, pincode, limit):
+    needle = ' '.join(_terms(text))
+    pattern = '%' + needle.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    location = db.func.lower(ParkingLot.location)
+    address = db.func.lower(Address.address)
+    query = db.session.query(ParkingLot.id).join(Address).filter(db.or_(
+        location.like(pattern),
+        db.literal(needle).op('<%')(location),
+        db.literal(needle).op('<%')(address)
+    ))
+    if pincode:
+        query = query.filter(Address.pincode == pincode)
+    query = query.order_by(
+        location.like(needle.replace('%', '\\%').replace('_', '\\_') + '%').desc(),
+        db.func.greatest(db.func.word_similarity(needle, location),
+                         db.func.word_similarity(needle, address) * 0.8).desc(),
+        ParkingLot.id
+    )
+    if limit:
+        query = query.limit(limit)
+    return [row[0] for row in query.all()]
+
+def _substring_matches(text, pincode, limit):
+    query = db.session.query(ParkingLot.id).filter(ParkingLot.location.ilike(f'%{text}%'))
+    if pincode:
+        query = query.join(Address).filter(Address.pincode == pincode)
+    query = query.order_by(ParkingLot.id)
+    if limit:
+        query = query.limit(limit)
+    return [row[0] for row in query.all()]
+
+def match_lot_ids(text, pincode=None, limit=None, vocabulary=None):
+    """
+    Rank parking lots against a free-text query.
+
+    Every term is matched as a word prefix ('mum mal' finds 'Mumbai Mall'),
+    misspelt terms are widened to close spellings and results are ordered
+    by relevance, location matches first.
+
+    Args:
+        text: Free-text query over location, address and pincode
+        pincode: Optional exact pincode filter
+        limit: Optional maximum number of results
+        vocabulary: SQLite only, terms for typo correction (default: read from the index)
+
+    Returns:
+        List of lot IDs, best match first
+    """
+    if not _terms(text):
+        return []
+
+    if not search_index_available():
+        return _substring_matches(text, pincode, limit)
+
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name == 'sqlite':
+        if vocabulary is None:
+            vocabulary = search_vocabulary()
+        return _sqlite_matches(text, pincode, limit, vocabulary)
+    if dialect_name == 'postgresql':
+        return _postgresql_matches(text, pincode, limit)
+    return _substring_matches(text, pincode, limit)
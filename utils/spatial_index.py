@@ -0,0 +1,132 @@
+import threading
+import time
+from math import cos, radians, floor
+import numpy as np
+from models.models import db, ParkingLot
+
+# Size of one grid cell in degrees (~11 km of latitude)
+CELL_SIZE_DEG = 0.1
+
+# Kilometres per degree of latitude
+KM_PER_DEG_LAT = 111.0
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Compute a lat/lon bounding box that fully contains a circle.
+
+    Args:
+        lat, lon: Centre of the circle
+        radius_km: Circle radius in kilometers
+
+    Returns:
+        Tuple (min_lat, max_lat, min_lon, max_lon)
+    """
+    dlat = radius_km / KM_PER_DEG_LAT
+
+    # Longitude degrees shrink towards the poles
+    cos_lat = cos(radians(lat))
+    if cos_lat < 1e-6:
+        dlon = 180.0
+    else:
+        dlon = min(radius_km / (KM_PER_DEG_LAT * cos_lat), 180.0)
+
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+def _cell(lat, lon):
+    return int(floor(lat / CELL_SIZE_DEG)), int(floor(lon / CELL_SIZE_DEG))
+
+class LotSpatialIndex:
+    """
+    In-memory grid index of parking lot coordinates.
+
+    Lots are bucketed into CELL_SIZE_DEG x CELL_SIZE_DEG cells and stored
+    cell by cell in contiguous id/latitude/longitude arrays, so a radius
+    query only slices the cells overlapping its bounding box. The database
+    stays the source of truth: the index is rebuilt lazily after it is
+    invalidated (admin lot changes) or once it is older than max_age seconds,
+    which bounds staleness across worker processes.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._slices = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lons = np.empty(0, dtype=np.float64)
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the index stale so the next query rebuilds it."""
+        self._built_at = None
+
+    def is_fresh(self):
+        return self._built_at is not None and time.monotonic() - self._built_at < self.max_age
+
+    def rebuild(self):
+        """Reload lot coordinates from the database into the grid."""
+        rows = db.session.query(ParkingLot.id, ParkingLot.latitude, ParkingLot.longitude).filter(
+            ParkingLot.latitude.isnot(None),
+            ParkingLot.longitude.isnot(None)
+        ).all()
+        rows.sort(key=lambda row: _cell(row[1], row[2]))
+
+        slices = {}
+        for position, (_, lat, lon) in enumerate(rows):
+            key = _cell(lat, lon)
+            start, _ = slices.get(key, (position, position))
+            slices[key] = (start, position + 1)
+
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        lats = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        lons = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+
+        with self._lock:
+            self._slices = slices
+            self._ids, self._lats, self._lons = ids, lats, lons
+            self._built_at = time.monotonic()
+
+    def candidates(self, lat, lon, radius_km):
+        """
+        Return lots whose coordinates fall inside the query bounding box.
+
+        Args:
+            lat, lon: Query centre
+            radius_km: Search radius in kilometers
+
+        Returns:
+            Tuple of (ids, latitudes, longitudes) NumPy arrays
+        """
+        if not self.is_fresh():
+            self.rebuild()
+
+        with self._lock:
+            slices = self._slices
+            ids, lats, lons = self._ids, self._lats, self._lons
+
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        min_row, min_col = _cell(min_lat, min_lon)
+        max_row, max_col = _cell(max_lat, max_lon)
+
+        # For very large radii walking the populated cells is cheaper
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(slices):
+            ranges = [span for key, span in slices.items()
+                      if min_row <= key[0] <= max_row and min_col <= key[1] <= max_col]
+        else:
+            ranges = [slices[(row, col)]
+                      for row in range(min_row, max_row + 1)
+                      for col in range(min_col, max_col + 1)
+                      if (row, col) in slices]
+
+        if not ranges:
+            empty = np.empty(0)
+            return empty.astype(np.int64), empty, empty
+
+        positions = np.concatenate([np.arange(start, end) for start, end in ranges])
+        cand_lats = lats[positions]
+        cand_lons = lons[positions]
+        mask = ((cand_lats >= min_lat) & (cand_lats <= max_lat) &
+                (cand_lons >= min_lon) & (cand_lons <= max_lon))
+        return ids[positions][mask], cand_lats[mask], cand_lons[mask]
+
+spatial_index = LotSpatialIndex()
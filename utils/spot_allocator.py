@@ -0,0 +1,196 @@
+import heapq
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.models import db, ParkingSpot
+
+class SpotAllocationBusy(RuntimeError):
+    """Raised when every claim attempt lost to a concurrent booking, though spots may still be free."""
+
+class _LotFreeSpots:
+    __slots__ = ('heap', 'spot_ids', 'loaded_at')
+
+    def __init__(self, spots):
+        # spotNumber -> spot id for every free spot; the heap may hold
+        # stale numbers, which are skipped lazily on acquire
+        self.spot_ids = dict(spots)
+        self.heap = list(self.spot_ids)
+        heapq.heapify(self.heap)
+        self.loaded_at = time.monotonic()
+
+class FreeSpotPool:
+    """
+    Per-lot min-heaps of free spot numbers held in memory.
+    
+    Lets the booking path pick the lowest free spot without a read query.
+    The database remains the source of truth: every claim is confirmed with
+    a conditional UPDATE, a lot whose cache proves stale is dropped, and
+    each lot is reloaded once it is older than max_age seconds so spots
+    freed by other worker processes are picked up.
+    """
+
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._lots = {}
+        self._lock = threading.Lock()
+
+    def _load(self, lot_id=None):
+        query = db.session.query(ParkingSpot.lotId, ParkingSpot.spotNumber, ParkingSpot.id).filter(
+            ParkingSpot.status == 'A'
+        )
+        if lot_id is not None:
+            query = query.filter(ParkingSpot.lotId == lot_id)
+        
+        spots_by_lot = {}
+        for spot_lot_id, spot_number, spot_id in query.all():
+            spots_by_lot.setdefault(spot_lot_id, []).append((spot_number, spot_id))
+        
+        if lot_id is not None:
+            spots_by_lot.setdefault(lot_id, [])
+        return {key: _LotFreeSpots(spots) for key, spots in spots_by_lot.items()}
+
+    def warm(self):
+        """Load free spots for every lot."""
+        lots = self._load()
+        with self._lock:
+            self._lots = lots
+
+    def invalidate(self, lot_id=None):
+        """Drop one lot (or all lots) so they are reloaded on next use."""
+        with self._lock:
+            if lot_id is None:
+                self._lots = {}
+            else:
+                self._lots.pop(lot_id, None)
+
+    def acquire(self, lot_id):
+        """
+        Remove and return the lowest free spot of a lot.
+        
+        Args:
+            lot_id: ID of the parking lot
+        
+        Returns:
+            Tuple (spot_number, spot_id), or None if no free spot is cached
+        """
+        with self._lock:
+            entry = self._lots.get(lot_id)
+        if entry is None or time.monotonic() - entry.loaded_at >= self.max_age:
+            entry = self._load(lot_id)[lot_id]
+            with self._lock:
+                self._lots[lot_id] = entry
+        
+        with self._lock:
+            while entry.heap:
+                spot_number = heapq.heappop(entry.heap)
+                spot_id = entry.spot_ids.pop(spot_number, None)
+                if spot_id is not None:
+                    return spot_number, spot_id
+        return None
+
+    def release(self, lot_id, spot_number, spot_id):
+        """Return a freed spot to its lot, if that lot is cached."""
+        with self._lock:
+            entry = self._lots.get(lot_id)
+            if entry is not None and spot_number not in entry.spot_ids:
+                entry.spot_ids[spot_number] = spot_id
+                heapq.heappush(entry.heap, spot_number)
+
+free_spot_pool = FreeSpotPool()
+
+# Spots taken from the pool by a session's open transaction, as (lot_id, spot_number, spot_id)
+_POOL_CLAIMS_KEY = 'free_spot_pool_claims'
+
+@event.listens_for(Session, 'after_commit')
+def _keep_pool_claims(session):
+    session.info.pop(_POOL_CLAIMS_KEY, None)
+
+@event.listens_for(Session, 'after_transaction_end')
+def _return_pool_claims(session, transaction):
+    # Claims still listed when the outermost transaction ends were rolled back
+    if transaction.parent is None:
+        for lot_id, spot_number, spot_id in session.info.pop(_POOL_CLAIMS_KEY, ()):
+            free_spot_pool.release(lot_id, spot_number, spot_id)
+
+def _lowest_free_spot(lot_id):
+    return db.select(ParkingSpot.id).where(
+        ParkingSpot.lotId == lot_id,
+        ParkingSpot.status == 'A'
+    ).order_by(ParkingSpot.spotNumber).limit(1)
+
+def _claim(spot_id):
+    result = db.session.execute(
+        db.update(ParkingSpot)
+        .where(ParkingSpot.id == spot_id, ParkingSpot.status == 'A')
+        .values(status='O')
+    )
+    return result.rowcount == 1
+
+def _allocate_from_pool(lot_id):
+    cached = free_spot_pool.acquire(lot_id)
+    if cached is None:
+        return None
+    
+    spot_number, spot_id = cached
+    if _claim(spot_id):
+        # Put the spot back in the pool if the booking never commits
+        db.session.info.setdefault(_POOL_CLAIMS_KEY, []).append((lot_id, spot_number, spot_id))
+        return spot_id
+    
+    # Another worker took the spot; this lot's cache is stale
+    free_spot_pool.invalidate(lot_id)
+    return None
+
+def allocate_spot(lot_id, max_attempts=10):
+    """
+    Atomically claim the lowest-numbered free spot in a lot.
+    
+    With FREE_SPOT_CACHE_ENABLED the spot comes from the in-memory
+    free_spot_pool and is confirmed with a single conditional UPDATE.
+    Otherwise, or when the cache has nothing usable, the database is
+    queried: on PostgreSQL the candidate row is locked with SELECT ... FOR
+    UPDATE SKIP LOCKED, so concurrent bookings each take a different spot
+    without waiting. Other databases use a compare-and-set UPDATE ... WHERE
+    status='A' that only one transaction can win; losers retry with the
+    next free spot. The claim is part of the caller's transaction.
+    
+    Args:
+        lot_id: ID of the parking lot
+        max_attempts: Compare-and-set retries before giving up
+    
+    Returns:
+        ID of the claimed spot, or None if the lot is full
+    
+    Raises:
+        SpotAllocationBusy: If all max_attempts claims lost to other bookings,
+            or on PostgreSQL every free spot is locked by one
+    """
+    if current_app.config.get('FREE_SPOT_CACHE_ENABLED'):
+        spot_id = _allocate_from_pool(lot_id)
+        if spot_id is not None:
+            return spot_id
+    
+    if db.session.get_bind().dialect.name == 'postgresql':
+        spot_id = db.session.execute(
+            _lowest_free_spot(lot_id).with_for_update(skip_locked=True)
+        ).scalar()
+        if spot_id is None:
+            # Free rows may all be locked by bookings still in flight
+            if db.session.execute(db.select(_lowest_free_spot(lot_id).exists())).scalar():
+                raise SpotAllocationBusy(f'Lot {lot_id} is too busy to claim a spot; try again')
+            return None
+        db.session.execute(
+            db.update(ParkingSpot).where(ParkingSpot.id == spot_id).values(status='O')
+        )
+        return spot_id
+    
+    for _ in range(max_attempts):
+        spot_id = db.session.execute(_lowest_free_spot(lot_id)).scalar()
+        if spot_id is None:
+            return None
+        if _claim(spot_id):
+            return spot_id
+    
+    raise SpotAllocationBusy(f'Lot {lot_id} is too busy to claim a spot; try again')
@@ -0,0 +1,37 @@
+import base64
+
+def _pack(bits):
+    return base64.b64encode(bytes(bits)).decode('ascii')
+
+def encode_spot_bitmap(spots):
+    """
+    Pack a lot's spot occupancy into two bitmaps.
+    
+    Bit n-1 (least significant bit first within each byte) stands for spot
+    number n. 'spots' marks which spot numbers exist and 'occupied' marks
+    which of those are taken, so a 1000-spot lot fits in 250 bytes before
+    base64 encoding.
+    
+    Args:
+        spots: Iterable of (spotNumber, status) pairs
+    
+    Returns:
+        Dict with maxSpotNumber and base64-encoded 'spots'/'occupied' bitmaps
+    """
+    spots = list(spots)
+    max_spot_number = max((spot_number for spot_number, _ in spots), default=0)
+    size = (max_spot_number + 7) // 8
+    existing = bytearray(size)
+    occupied = bytearray(size)
+    
+    for spot_number, status in spots:
+        index, bit = divmod(spot_number - 1, 8)
+        existing[index] |= 1 << bit
+        if status == 'O':
+            occupied[index] |= 1 << bit
+    
+    return {
+        'maxSpotNumber': max_spot_number,
+        'spots': _pack(existing),
+        'occupied': _pack(occupied)
+    }
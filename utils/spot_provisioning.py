@@ -0,0 +1,63 @@
+import csv
+import io
+from models.models import db, ParkingSpot
+
+def _copy_spots(rows):
+    """Stream rows into parking_spot with PostgreSQL COPY on the session's connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow((row['lotId'], row['spotNumber'], row['status']))
+    buffer.seek(0)
+    
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            'COPY parking_spot ("lotId", "spotNumber", status) FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def bulk_insert_spots(rows):
+    """
+    Insert many parking spots in one round trip.
+    
+    Uses COPY on PostgreSQL (psycopg2) and a multi-row executemany INSERT
+    elsewhere. Rows are written inside the caller's transaction and no ORM
+    objects are created.
+    
+    Args:
+        rows: List of dicts with 'lotId', 'spotNumber' and 'status' keys
+    
+    Returns:
+        Number of spots inserted
+    """
+    if not rows:
+        return 0
+    
+    bind = db.session.get_bind()
+    if bind.dialect.name == 'postgresql' and bind.dialect.driver == 'psycopg2':
+        _copy_spots(rows)
+    else:
+        db.session.execute(db.insert(ParkingSpot), rows)
+    
+    return len(rows)
+
+def provision_spots(lot_id, count, first_spot_number=1, status='A'):
+    """
+    Create a consecutive run of spots for a lot.
+    
+    Args:
+        lot_id: ID of the parking lot
+        count: Number of spots to create
+        first_spot_number: Spot number of the first new spot
+        status: Initial status of every spot
+    
+    Returns:
+        Number of spots inserted
+    """
+    return bulk_insert_spots([
+        {'lotId': lot_id, 'spotNumber': spot_number, 'status': status}
+        for spot_number in range(first_spot_number, first_spot_number + count)
+    ])
@@ -1,6 +1,9 @@
 from app import createApp
+from utils.render_pool import render_pool
 
 app = createApp()
 
 if __name__ == "__main__":
+    # Spawned render workers would re-import this script and build another app each
+    render_pool.configure(0, app.config['RENDER_TIMEOUT_SECONDS'])
     app.run()